@@ -1,19 +1,70 @@
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from .models import GenerateRequest, GenerateResponse, JobStatus, DownloadResponse, Idea
+from fastapi.responses import StreamingResponse
+from .models import (
+    GenerateRequest,
+    GenerateResponse,
+    BatchGenerateRequest,
+    BatchGenerateResponse,
+    JobStatus,
+    DownloadResponse,
+    RegenerateResponse,
+    Idea
+)
 from .db import (
     SessionLocal, 
     save_user_if_not_exists, 
     create_idea, 
     update_idea_status, 
-    save_output
+    save_output,
+    update_output
 )
+from . import job_events, thread_budget, workers
+from .config import settings
+from .utils import SingleFlight
 from sqlalchemy.orm import Session
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import asyncio
+import json
+import threading
+import time
 import uuid
 import os
 import traceback
 
 router = APIRouter(prefix="/api")
 
+# Server-sent event polling interval and keep-alive period (seconds)
+STREAM_POLL_SECONDS = 0.1
+STREAM_KEEPALIVE_SECONDS = 15
+
+# Lazy artifact renders in progress, by job_id
+_artifact_renders = SingleFlight()
+
+# Per-job locks so a regeneration and a lazy render never interleave their
+# reads and writes of the same job's content and files; job_id -> [lock, holders
+# and waiters], removed when the last one leaves so the dict stays small
+_job_locks: Dict[str, list] = {}
+_job_locks_lock = threading.Lock()
+
+# Branding sections published to job streams once generated
+STREAMED_BRANDING_SECTIONS = ["brand_names", "slogans", "logo_prompts", "ad_copies", "pitch_sections"]
+
+
+@contextmanager
+def _job_lock(job_id: str) -> Iterator[None]:
+    with _job_locks_lock:
+        entry = _job_locks.setdefault(job_id, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _job_locks_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _job_locks[job_id]
+
 
 def get_db():
     db = SessionLocal()
@@ -34,12 +85,38 @@ async def generate(request: GenerateRequest, background_tasks: BackgroundTasks,
     # Use idea_id as job_id for simplicity
     job_id = str(idea_id)
     
+    # Open the event stream before the job can publish to it
+    job_events.open_stream(job_id)
+    
     # Start background processing
-    background_tasks.add_task(process_idea_job, job_id, idea_id, request.email)
+    background_tasks.add_task(process_idea_job, job_id, idea_id, request.email, fresh=request.fresh)
     
     return GenerateResponse(job_id=job_id, status="processing")
 
 
+@router.post("/generate/batch", response_model=BatchGenerateResponse)
+async def generate_batch(request: BatchGenerateRequest, background_tasks: BackgroundTasks):
+    """Submit several ideas at once; they are parsed together in one NLP batch."""
+    ideas = [idea for idea in request.ideas if idea.strip()]
+    if not ideas:
+        raise HTTPException(status_code=400, detail="No ideas provided")
+    
+    user_id = save_user_if_not_exists(request.email)
+    
+    jobs = []
+    for idea_text in ideas:
+        idea_id = create_idea(user_id, idea_text)
+        job_id = str(idea_id)
+        job_events.open_stream(job_id)
+        jobs.append((job_id, idea_id))
+    
+    background_tasks.add_task(process_idea_batch, jobs, request.email, fresh=request.fresh)
+    
+    return BatchGenerateResponse(
+        jobs=[GenerateResponse(job_id=job_id, status="processing") for job_id, _ in jobs]
+    )
+
+
 @router.get("/status/{job_id}", response_model=JobStatus)
 async def get_status(job_id: str, db: Session = Depends(get_db)):
     # job_id is the idea_id
@@ -70,14 +147,126 @@ async def get_status(job_id: str, db: Session = Depends(get_db)):
 @router.get("/download/{job_id}", response_model=DownloadResponse)
 async def download(job_id: str, db: Session = Depends(get_db)):
     # Check if zip file exists
-    from .assembler import create_downloadable_zip
+    from .assembler import AssemblyError, create_downloadable_zip
     
     try:
-        zip_path = create_downloadable_zip(job_id)
+        zip_path = create_downloadable_zip(job_id, settings.output_dir)
         # In production, serve the file or return a signed URL
         return DownloadResponse(url=f"/files/{job_id}.zip")
     except FileNotFoundError:
+        pass
+    
+    # Not rendered yet (ARTIFACT_MODE=lazy): render once from the stored content;
+    # concurrent first requests share the same render
+    try:
+        idea = db.query(Idea).filter(Idea.id == int(job_id)).first()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job_id")
+    if not idea or idea.status != "completed":
         raise HTTPException(status_code=404, detail="Output not ready or not found")
+    
+    try:
+        await asyncio.to_thread(_artifact_renders.do, job_id, render_job_artifacts, job_id)
+    except AssemblyError as e:
+        raise HTTPException(status_code=500, detail=f"Could not render artifacts: {e}")
+    return DownloadResponse(url=f"/files/{job_id}.zip")
+
+
+@router.post("/regenerate/{job_id}/{section}", response_model=RegenerateResponse)
+async def regenerate(job_id: str, section: str, db: Session = Depends(get_db)):
+    """Regenerate one branding section of a completed job.
+    
+    Research is not re-run; only the named section is generated again and
+    only the slides, PDF and asset entries that show it are re-rendered.
+    """
+    from .assembler import AssemblyError
+    from .generator_agent import BRANDING_SECTIONS
+    
+    if section not in BRANDING_SECTIONS:
+        raise HTTPException(status_code=400, detail=f"Unknown section. Expected one of: {', '.join(BRANDING_SECTIONS)}")
+    try:
+        idea = db.query(Idea).filter(Idea.id == int(job_id)).first()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid job_id")
+    if not idea:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if idea.status != "completed":
+        raise HTTPException(status_code=400, detail=f"Job not completed yet. Current status: {idea.status}")
+    
+    try:
+        result = await asyncio.to_thread(regenerate_job_section, job_id, section)
+    except workers.WorkerPoolBusyError:
+        raise HTTPException(status_code=503, detail="Generation workers are busy, try again shortly")
+    except workers.WorkerPoolStoppedError:
+        raise HTTPException(status_code=503, detail="Generation workers are shutting down")
+    except workers.WorkerTimeoutError:
+        raise HTTPException(status_code=504, detail="Regeneration timed out")
+    except AssemblyError as e:
+        raise HTTPException(status_code=500, detail=f"Could not render artifacts: {e}")
+    if result is None:
+        raise HTTPException(status_code=409, detail=f"No new variation of {section} is available")
+    return RegenerateResponse(**result)
+
+
+@router.get("/stream/{job_id}")
+async def stream_job(job_id: str, db: Session = Depends(get_db)):
+    """Stream job progress and generated sections as server-sent events.
+    
+    Events:
+        status: ``{"stage": ...}`` when the pipeline enters a new stage
+        delta: ``{"section": ..., "text": ...}`` incremental LLM output
+        reset: ``{"section": ..., "reason": ...}`` the stream for a section
+            failed partway; discard its deltas (a fallback follows as ``section``)
+        section: ``{"section": ..., "content": ...}`` a finished section
+            (supersedes any deltas received for it)
+        artifacts: ``{"artifacts": ..., "seconds": ...}`` the render report,
+            once the package is assembled (``ARTIFACT_MODE=eager`` only)
+        done: ``{"status": "completed" | "failed"}``, then the stream ends
+    
+    Responds 409 for a job that is still running but whose events are not
+    held by this process (after a restart or in another worker process);
+    poll ``/status`` for those.
+    """
+    stream = job_events.get_stream(job_id)
+    if stream is None:
+        try:
+            idea = db.query(Idea).filter(Idea.id == int(job_id)).first()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid job_id")
+        if not idea:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        if idea.status not in ("completed", "failed"):
+            # Nothing in this process publishes to or closes this job's stream
+            raise HTTPException(status_code=409, detail="Live progress for this job is not available; poll /status instead")
+        # History was not kept; results are available from /results
+        stream = job_events.open_stream(job_id)
+        stream.close(idea.status)
+    
+    async def event_source():
+        index = 0
+        last_sent = time.monotonic()
+        while True:
+            events = stream.events_since(index)
+            for event, data in events:
+                yield f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+            index += len(events)
+            
+            if events:
+                last_sent = time.monotonic()
+            elif stream.closed:
+                break
+            elif time.monotonic() - last_sent > STREAM_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            
+            await asyncio.sleep(STREAM_POLL_SECONDS)
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 
 @router.get("/results/{job_id}")
@@ -124,6 +313,8 @@ async def get_results(job_id: str, db: Session = Depends(get_db)):
             results["logo_prompts"] = content.get("logo_prompts", [])
             results["ad_copies"] = content.get("ad_copies", [])
             results["pitch_sections"] = content.get("pitch_sections", {})
+            if "provenance" in content:
+                results["provenance"] = content["provenance"]
         elif output.output_type == "research" and output.content_json:
             # Include research results (market insights, competitors)
             research = output.content_json
@@ -134,16 +325,190 @@ async def get_results(job_id: str, db: Session = Depends(get_db)):
     return results
 
 
-def process_idea_job(job_id: str, idea_id: int, email: str):
+@router.get("/stats")
+async def get_stats():
+    """Runtime counters for caches and upstream dependencies."""
+    from .llm_client import get_llm_stats
+    from .nlp_parser import nlp_status, parse_memo_stats
+    from .text_model import model_status
+    from .generator_agent import generation_cache_stats
+    from .brand_names import filter_status
+
+    return {
+        "llm": get_llm_stats(),
+        "nlp": {**nlp_status(), "memo": parse_memo_stats()},
+        "generator": {**model_status(), "cache": generation_cache_stats(), "name_filter": filter_status()},
+        "workers": workers.pool_status(),
+        "threads": thread_budget.status(),
+        "artifacts": {"mode": settings.artifact_mode, "renders": _artifact_renders.stats()}
+    }
+
+
+def assemble_job(job_id: str, idea_id: int, parsed_idea: dict, research_results: dict,
+                 branding_content: dict) -> dict:
+    """Render a job's pitch deck, PDF, assets and zip and record them.
+    
+    Returns:
+        The render report from ``assembler.render_artifacts``
+    """
+    from .assembler import render_artifacts
+    
+    output_dir = os.path.join(settings.output_dir, job_id)
+    assembly = render_artifacts(parsed_idea, research_results, branding_content, output_dir)
+    timings = ", ".join(
+        f"{name} {entry['seconds']:.2f}s" if entry["path"] else f"{name} failed"
+        for name, entry in assembly["artifacts"].items()
+    )
+    print(f"[Job {job_id}] Assembled in {assembly['seconds']:.2f}s ({timings})")
+    
+    # Save ZIP output
+    save_output(
+        idea_id=idea_id,
+        output_type="zip",
+        content={"job_id": job_id},
+        file_path=assembly["zip"]
+    )
+    
+    # Save per-artifact render report (timings and failures)
+    save_output(
+        idea_id=idea_id,
+        output_type="artifacts",
+        content=assembly,
+        file_path=None
+    )
+    return assembly
+
+
+def load_job_content(idea_id: int) -> Tuple[dict, dict, dict]:
+    """Load a completed job's parsed idea, research and branding from the DB.
+    
+    Returns:
+        (parsed_idea, research_results, branding_content); the most recent
+        output of each type wins
+    """
+    from .models import Output
+    
+    db = SessionLocal()
+    try:
+        idea = db.query(Idea).filter(Idea.id == idea_id).first()
+        outputs = (
+            db.query(Output)
+            .filter(Output.idea_id == idea_id, Output.output_type.in_(["research", "pptx"]))
+            .order_by(Output.id)
+            .all()
+        )
+        content = {output.output_type: output.content_json or {} for output in outputs}
+        return (idea.parsed_json or {}) if idea else {}, content.get("research", {}), content.get("pptx", {})
+    finally:
+        db.close()
+
+
+def render_job_artifacts(job_id: str) -> str:
+    """Render a completed job's artifacts from its stored content (lazy mode).
+    
+    Returns:
+        Path to the job's zip
+    """
+    from .assembler import create_downloadable_zip
+    
+    try:
+        # Rendered by a request that finished just before this one started
+        return create_downloadable_zip(job_id, settings.output_dir)
+    except FileNotFoundError:
+        pass
+    idea_id = int(job_id)
+    with _job_lock(job_id):
+        parsed_idea, research_results, branding_content = load_job_content(idea_id)
+        return assemble_job(job_id, idea_id, parsed_idea, research_results, branding_content)["zip"]
+
+
+def regenerate_job_section(job_id: str, section: str) -> Optional[dict]:
+    """Regenerate one branding section of a job and update what depends on it.
+    
+    The job's stored parsed idea and research are reused. If the job's
+    artifacts have been rendered, the affected ones are re-rendered first;
+    only then does the new section replace the old one in the stored
+    branding content, with its provenance recorded as
+    "regenerated:model" or "regenerated:template".
+    
+    Returns:
+        job_id, section, the new content, the re-render report's
+        artifacts and the total seconds taken; None when the generator
+        produced the same content again, in which case nothing is updated
+    """
+    from .assembler import rerender_section
+    
+    started = time.perf_counter()
+    idea_id = int(job_id)
+    with _job_lock(job_id):
+        parsed_idea, research_results, branding_content = load_job_content(idea_id)
+        previous = branding_content.get(section)
+        content, source = workers.run_regenerate_section(section, parsed_idea, research_results, previous)
+        if content == previous:
+            # Nothing new (e.g. a template-only section); keep the artifacts as they are
+            return None
+        branding_content[section] = content
+        branding_content.setdefault("provenance", {})[section] = f"regenerated:{source}"
+        
+        artifacts = {}
+        output_dir = os.path.join(settings.output_dir, job_id)
+        # Jobs in lazy mode that were never downloaded have nothing to update.
+        # Render before storing: if it fails, the stored content still matches the files
+        if os.path.isdir(output_dir):
+            report = rerender_section(section, parsed_idea, research_results, branding_content, output_dir)
+            artifacts = report["artifacts"]
+        update_output(idea_id, "pptx", branding_content)
+    
+    seconds = round(time.perf_counter() - started, 4)
+    print(f"[Job {job_id}] Regenerated {section} in {seconds:.2f}s (re-rendered: {', '.join(artifacts) or 'nothing'})")
+    return {"job_id": job_id, "section": section, "content": content, "artifacts": artifacts, "seconds": seconds}
+
+
+def process_idea_batch(jobs: List[Tuple[str, int]], email: str, fresh: bool = False):
+    """Parse a batch of ideas in one NLP pass, then run each job's pipeline.
+    
+    Args:
+        jobs: (job_id, idea_id) pairs
+        email: User email
+        fresh: Generate new branding variations instead of reusing cached ones
+    """
+    db = SessionLocal()
+    try:
+        idea_ids = [idea_id for _, idea_id in jobs]
+        texts = {idea.id: idea.idea_text for idea in db.query(Idea).filter(Idea.id.in_(idea_ids))}
+    finally:
+        db.close()
+    
+    found = [(job_id, idea_id) for job_id, idea_id in jobs if idea_id in texts]
+    print(f"[Batch] Parsing {len(found)} ideas...")
+    try:
+        parsed_ideas = workers.run_parse_ideas([texts[idea_id] for _, idea_id in found])
+    except Exception as e:
+        # Each job parses its own idea instead
+        print(f"[Batch] Batch parsing failed: {e}")
+        parsed_ideas = [None] * len(found)
+    
+    for (job_id, idea_id), parsed_idea in zip(found, parsed_ideas):
+        process_idea_job(job_id, idea_id, email, parsed_idea=parsed_idea, fresh=fresh)
+
+
+def process_idea_job(job_id: str, idea_id: int, email: str, parsed_idea: Optional[dict] = None,
+                     fresh: bool = False):
     """Background workflow to process an idea through the complete pipeline.
     
     Args:
         job_id: Unique job identifier (UUID)
         idea_id: Database ID of the idea record
         email: User email
+        parsed_idea: Already-parsed idea structure (e.g. from a batch parse);
+            the idea text is parsed here when omitted
+        fresh: Generate new branding variations instead of reusing cached ones
     """
     db = SessionLocal()
     
+    def publish(event: str, **data):
+        job_events.publish(job_id, event, **data)
+    
     try:
         print(f"[Job {job_id}] Starting processing for idea {idea_id}")
         
@@ -156,9 +521,10 @@ def process_idea_job(job_id: str, idea_id: int, email: str):
         if not idea:
             raise ValueError(f"Idea {idea_id} not found")
         
-        print(f"[Job {job_id}] Parsing idea text...")
-        from .nlp_parser import parse_idea
-        parsed_idea = parse_idea(idea.idea_text)
+        publish("status", stage="parsing")
+        if parsed_idea is None:
+            print(f"[Job {job_id}] Parsing idea text...")
+            parsed_idea = workers.run_parse_idea(idea.idea_text)
         
         # Save parsed data to idea record
         idea.parsed_json = parsed_idea
@@ -167,27 +533,33 @@ def process_idea_job(job_id: str, idea_id: int, email: str):
         
         # Step 3: Run research agent
         print(f"[Job {job_id}] Running research agent...")
+        publish("status", stage="research")
         from .research_agent import run_research
-        research_results = run_research(parsed_idea)
+        research_results = run_research(
+            parsed_idea,
+            on_delta=lambda text: publish("delta", section="summary_text", text=text),
+            on_reset=lambda: publish("reset", section="summary_text", reason="summary_fallback"),
+        )
+        for section in ("summary_text", "key_opportunities", "key_risks"):
+            publish("section", section=section, content=research_results.get(section))
         print(f"[Job {job_id}] Research completed: {len(research_results.get('competitors', []))} competitors found")
         
         # Step 4: Run generator agent
         print(f"[Job {job_id}] Generating branding and content...")
-        from .generator_agent import generate_branding_and_content
-        branding_content = generate_branding_and_content(parsed_idea, research_results)
+        publish("status", stage="generation")
+        branding_content = workers.run_generate(parsed_idea, research_results, fresh=fresh)
+        for section in STREAMED_BRANDING_SECTIONS:
+            publish("section", section=section, content=branding_content.get(section))
         print(f"[Job {job_id}] Generated {len(branding_content.get('brand_names', []))} brand names")
         
-        # Step 5: Assemble outputs
-        print(f"[Job {job_id}] Assembling output package...")
-        from .assembler import assemble_package, create_downloadable_zip
-        
-        output_dir = os.path.join("outputs", job_id)
-        pptx_path = assemble_package(parsed_idea, research_results, branding_content, output_dir)
-        print(f"[Job {job_id}] PPTX created at {pptx_path}")
-        
-        # Create zip file
-        zip_path = create_downloadable_zip(job_id)
-        print(f"[Job {job_id}] Zip file created at {zip_path}")
+        # Step 5: Assemble outputs (in lazy mode on the first download instead)
+        pptx_path = None
+        if settings.artifact_mode == "eager":
+            print(f"[Job {job_id}] Assembling output package...")
+            publish("status", stage="assembly")
+            assembly = assemble_job(job_id, idea_id, parsed_idea, research_results, branding_content)
+            publish("artifacts", artifacts=assembly["artifacts"], seconds=assembly["seconds"])
+            pptx_path = assembly["artifacts"]["pitch_deck"]["path"]
         
         # Step 6: Save outputs to DB
         print(f"[Job {job_id}] Saving outputs to database...")
@@ -208,18 +580,11 @@ def process_idea_job(job_id: str, idea_id: int, email: str):
             file_path=pptx_path
         )
         
-        # Save ZIP output
-        save_output(
-            idea_id=idea_id,
-            output_type="zip",
-            content={"job_id": job_id},
-            file_path=zip_path
-        )
-        
         print(f"[Job {job_id}] Outputs saved to database")
         
         # Step 7: Update status to completed
         update_idea_status(idea_id, "completed")
+        job_events.close_stream(job_id, "completed")
         print(f"[Job {job_id}] Processing completed successfully!")
         
     except Exception as e:
@@ -231,6 +596,7 @@ def process_idea_job(job_id: str, idea_id: int, email: str):
             update_idea_status(idea_id, "failed")
         except:
             pass
+        job_events.close_stream(job_id, "failed")
         
     finally:
         db.close()
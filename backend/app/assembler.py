@@ -1,10 +1,21 @@
 """Assembler: combine outputs from research/generation into final package."""
+import io
 import os
 import json
+import multiprocessing
+import tempfile
+import threading
+import time
 import zipfile
-from typing import Dict, Any
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterator, List, Optional, Tuple
 from pathlib import Path
 from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.enum.shapes import MSO_SHAPE
 from pptx.util import Inches, Pt
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -12,6 +23,310 @@ from reportlab.lib.units import inch
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
+from .config import get_settings
+
+
+# Artifact name -> file name inside the job's output directory
+ARTIFACT_FILES = {
+    "pitch_deck": "pitch_deck.pptx",
+    "summary_pdf": "summary.pdf",
+    "assets": "assets.json",
+}
+
+
+# Artifacts that read each branding_content section; for the pitch deck,
+# the indexes (into SLIDE_FILLERS) of the slides that show it. Used to
+# re-render only what a regenerated section changes
+SECTION_DEPENDENCIES: Dict[str, Dict[str, Optional[List[int]]]] = {
+    "brand_names": {"pitch_deck": [0], "summary_pdf": None, "assets": None},
+    "slogans": {"pitch_deck": [0], "summary_pdf": None, "assets": None},
+    "logo_prompts": {"assets": None},
+    "ad_copies": {"assets": None},
+    "pitch_sections": {"pitch_deck": [1, 2, 3, 4, 6], "assets": None},
+}
+
+# Already-compressed formats, stored in the zip without deflating again
+STORED_EXTENSIONS = {".pptx", ".pdf", ".png", ".jpg", ".jpeg", ".zip"}
+
+
+class AssemblyError(Exception):
+    """Raised when no artifact of a package could be rendered."""
+
+
+# PPTX and PDF builds are pure-Python CPU work; rendering them in separate
+# processes lets them overlap instead of queueing on the GIL
+_render_pool: Optional[ProcessPoolExecutor] = None
+_render_pool_lock = threading.Lock()
+
+
+def _get_render_pool() -> Optional[ProcessPoolExecutor]:
+    """The shared render process pool, or None when RENDER_POOL_SIZE is 0."""
+    global _render_pool
+    size = get_settings().render_pool_size
+    if size <= 0:
+        return None
+    with _render_pool_lock:
+        if _render_pool is None:
+            _render_pool = ProcessPoolExecutor(
+                max_workers=size, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _render_pool
+
+
+def _reset_render_pool(broken: ProcessPoolExecutor) -> None:
+    """Drop a pool whose worker died or hung so the next package gets fresh processes.
+
+    Queued renders are cancelled; renders already running finish in the
+    old processes, which exit once they are done.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is broken:
+            _render_pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+
+
+def _ping() -> bool:
+    return True
+
+
+def start_render_pool() -> None:
+    """Spawn the render processes now so the first package does not pay
+    for process start-up and the pptx/reportlab imports."""
+    pool = _get_render_pool()
+    if pool is not None:
+        for _ in range(get_settings().render_pool_size):
+            pool.submit(_ping)
+
+
+def shutdown_render_pool() -> None:
+    """Stop the render pool (called on application shutdown)."""
+    global _render_pool
+    with _render_pool_lock:
+        pool, _render_pool = _render_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _timed_render(renderer, *args) -> Tuple[bytes, float]:
+    """Run one renderer and return its output and duration in seconds."""
+    started = time.perf_counter()
+    data = renderer(*args)
+    return data, time.perf_counter() - started
+
+
+def _compress_type(file_name: str) -> int:
+    """PPTX and PDF are already compressed; deflating them again only costs CPU."""
+    if os.path.splitext(file_name)[1].lower() in STORED_EXTENSIONS:
+        return zipfile.ZIP_STORED
+    return zipfile.ZIP_DEFLATED
+
+
+@contextmanager
+def _replacing(path: str) -> Iterator[str]:
+    """Yield a temporary path next to ``path`` and move it into place on success.
+
+    Every writer gets its own ``.tmp`` file, so concurrent writers of the
+    same file (a download rebuilding the zip while a regeneration rewrites
+    the package) never truncate or publish each other's half-written output.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".",
+                                    prefix=f"{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        # mkstemp creates the file owner-only; outputs are served as static files
+        os.chmod(tmp_path, 0o644)
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    """Write ``data`` to ``path`` so readers never see a partial file."""
+    with _replacing(path) as tmp_path:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+
+
+def _write_package(output_dir: str, zip_path: str, rendered: Dict[str, bytes]) -> None:
+    """Write rendered artifacts to the output directory and the zip in one pass.
+
+    Artifacts not in ``rendered`` are packed from their existing files, so
+    a partial re-render still produces a complete zip. The zip is written
+    last so it is never older than the files beside it (see
+    :func:`create_downloadable_zip`).
+    """
+    for name, data in rendered.items():
+        _write_atomic(os.path.join(output_dir, ARTIFACT_FILES[name]), data)
+    with _replacing(zip_path) as tmp_zip, zipfile.ZipFile(tmp_zip, "w") as zipf:
+        for name, file_name in ARTIFACT_FILES.items():
+            if name in rendered:
+                zipf.writestr(file_name, rendered[name], compress_type=_compress_type(file_name))
+            elif os.path.exists(os.path.join(output_dir, file_name)):
+                zipf.write(os.path.join(output_dir, file_name), file_name, compress_type=_compress_type(file_name))
+
+
+def _render_package(renderers: Dict[str, Tuple[Callable[..., bytes], tuple]], output_dir: str,
+                    zip_path: Optional[str]) -> Dict[str, Any]:
+    """Run ``renderers`` (artifact name -> renderer and its arguments)
+    concurrently and write their output; see :func:`render_artifacts`."""
+    settings = get_settings()
+    started = time.perf_counter()
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    zip_path = zip_path or f"{os.path.normpath(output_dir)}.zip"
+    # The assets JSON is cheap enough to build here while the pool works on the others
+    pooled = {name: job for name, job in renderers.items() if name != "assets"}
+
+    pool = _get_render_pool() if pooled else None
+    threads = None if pool is not None or not pooled else ThreadPoolExecutor(max_workers=len(pooled))
+    executor = pool or threads
+    futures: Dict[str, Future] = {}
+    rendered: Dict[str, bytes] = {}
+    report: Dict[str, Dict[str, Any]] = {}
+
+    def failed(name: str, error: str) -> None:
+        report[name] = {"path": None, "bytes": None, "seconds": None, "error": error}
+
+    def succeeded(name: str, data: bytes, seconds: float) -> None:
+        rendered[name] = data
+        report[name] = {
+            "path": os.path.join(output_dir, ARTIFACT_FILES[name]),
+            "bytes": len(data), "seconds": round(seconds, 4), "error": None,
+        }
+
+    try:
+        for name, (renderer, args) in pooled.items():
+            try:
+                futures[name] = executor.submit(_timed_render, renderer, *args)
+            except Exception as e:
+                # e.g. BrokenProcessPool on submit
+                failed(name, f"{type(e).__name__}: {e}")
+
+        if "assets" in renderers:
+            renderer, args = renderers["assets"]
+            try:
+                succeeded("assets", *_timed_render(renderer, *args))
+            except Exception as e:
+                failed("assets", f"{type(e).__name__}: {e}")
+
+        deadline = time.monotonic() + settings.render_timeout_seconds
+        for name, future in futures.items():
+            try:
+                succeeded(name, *future.result(timeout=max(0.0, deadline - time.monotonic())))
+            except FutureTimeoutError:
+                # cancel() cannot stop a renderer that is already running. In
+                # the process pool, retire the pool instead so the stuck
+                # process stops taking work and later packages get fresh
+                # ones; a thread renderer simply runs on unobserved.
+                future.cancel()
+                if pool is not None:
+                    _reset_render_pool(pool)
+                failed(name, f"timed out after {settings.render_timeout_seconds:g}s")
+            except BrokenProcessPool as e:
+                _reset_render_pool(pool)
+                failed(name, f"BrokenProcessPool: {e}")
+            except Exception as e:
+                failed(name, f"{type(e).__name__}: {e}")
+    finally:
+        if threads is not None:
+            threads.shutdown(wait=False)
+
+    for name, entry in report.items():
+        if entry["error"]:
+            print(f"⚠ Rendering {name} failed: {entry['error']}")
+    if not rendered:
+        raise AssemblyError("; ".join(f"{name}: {entry['error']}" for name, entry in report.items()))
+
+    _write_package(output_dir, zip_path, {name: rendered[name] for name in ARTIFACT_FILES if name in rendered})
+    return {
+        "artifacts": {name: report[name] for name in ARTIFACT_FILES if name in report},
+        "zip": zip_path,
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def render_artifacts(idea_struct: dict, research_results: dict, branding_content: dict,
+                     output_dir: str, zip_path: Optional[str] = None) -> Dict[str, Any]:
+    """Render the pitch deck, summary PDF and assets JSON concurrently.
+
+    The PPTX and PDF builds run in the render process pool (in threads
+    when ``RENDER_POOL_SIZE`` is 0) while the assets JSON is built in
+    the calling thread. Each artifact is rendered independently: one
+    failing or timing out does not stop the others. The timeout is
+    advisory for a render that has started: it is reported as failed
+    and, in the process pool, the pool is replaced so later packages do
+    not queue behind it. Renderers return
+    bytes, which are written to ``output_dir`` and the zip in one pass.
+
+    Args:
+        idea_struct: Parsed idea structure
+        research_results: Research findings
+        branding_content: Generated branding and content
+        output_dir: Output directory path (e.g., 'outputs/<job_id>')
+        zip_path: Where to write the zip (defaults to '<output_dir>.zip')
+
+    Returns:
+        ``artifacts`` (per artifact: path, bytes, seconds and error; path
+        is None when the artifact failed), ``zip`` (its path) and
+        ``seconds`` (wall time of the whole assembly)
+
+    Raises:
+        AssemblyError: If no artifact could be rendered
+    """
+    inputs = (idea_struct, research_results, branding_content)
+    return _render_package({
+        "pitch_deck": (_create_pitch_deck, inputs),
+        "summary_pdf": (_create_summary_pdf, inputs),
+        "assets": (_create_assets_json, (branding_content,)),
+    }, output_dir, zip_path)
+
+
+def rerender_section(section: str, idea_struct: dict, research_results: dict, branding_content: dict,
+                     output_dir: str, zip_path: Optional[str] = None) -> Dict[str, Any]:
+    """Re-render only the artifacts that depend on one branding section.
+
+    Uses SECTION_DEPENDENCIES: in the pitch deck only the affected slides
+    are refilled (in the existing deck when there is one), the summary
+    PDF is rebuilt only if it shows the section, and the other artifacts
+    are left alone. The zip is rewritten with the updated files.
+
+    Args:
+        section: The branding section that changed
+        idea_struct: Parsed idea structure
+        research_results: Research findings
+        branding_content: Branding content including the new section
+        output_dir: The job's output directory
+        zip_path: Where to write the zip (defaults to '<output_dir>.zip')
+
+    Returns:
+        Same report as :func:`render_artifacts`, listing only re-rendered
+        artifacts
+
+    Raises:
+        AssemblyError: If none of the affected artifacts could be rendered
+    """
+    dependencies = SECTION_DEPENDENCIES[section]
+    inputs = (idea_struct, research_results, branding_content)
+    renderers: Dict[str, Tuple[Callable[..., bytes], tuple]] = {}
+    if "pitch_deck" in dependencies:
+        deck_path = os.path.join(output_dir, ARTIFACT_FILES["pitch_deck"])
+        if os.path.exists(deck_path):
+            with open(deck_path, "rb") as f:
+                deck = f.read()
+            renderers["pitch_deck"] = (_update_pitch_deck, (deck, dependencies["pitch_deck"], *inputs))
+        else:
+            renderers["pitch_deck"] = (_create_pitch_deck, inputs)
+    if "summary_pdf" in dependencies:
+        renderers["summary_pdf"] = (_create_summary_pdf, inputs)
+    if "assets" in dependencies:
+        renderers["assets"] = (_create_assets_json, (branding_content,))
+    return _render_package(renderers, output_dir, zip_path)
+
 
 def assemble_package(idea_struct: dict, research_results: dict, branding_content: dict, output_dir: str) -> str:
     """Assemble complete package with PPTX, PDF, and JSON assets.
@@ -24,72 +339,126 @@ def assemble_package(idea_struct: dict, research_results: dict, branding_content
         
     Returns:
         Path to the main output file (pitch_deck.pptx)
+        
+    Raises:
+        AssemblyError: If no artifact could be rendered
     """
-    # Create output directory
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    # Generate pitch deck PPTX
-    pptx_path = os.path.join(output_dir, "pitch_deck.pptx")
-    _create_pitch_deck(idea_struct, research_results, branding_content, pptx_path)
-    
-    # Generate summary PDF
-    pdf_path = os.path.join(output_dir, "summary.pdf")
-    _create_summary_pdf(idea_struct, research_results, branding_content, pdf_path)
-    
-    # Save assets JSON
-    assets_path = os.path.join(output_dir, "assets.json")
-    _save_assets_json(branding_content, assets_path)
-    
-    return pptx_path
+    report = render_artifacts(idea_struct, research_results, branding_content, output_dir)
+    return report["artifacts"]["pitch_deck"]["path"]
+
+
+# Static text of the built-in deck template; slides are filled in this order
+DECK_SLIDE_TITLES = [
+    None,  # title slide: brand name and slogan
+    "The Problem",
+    "Our Solution",
+    "Market Opportunity",
+    "Business Model",
+    "Financial Projections",
+    "Team & The Ask",
+]
 
+FINANCIALS_TEXT = """Year 1: $100K ARR (projected)
+Year 2: $500K ARR (projected)
+Year 3: $2M ARR (projected)
 
-def _create_pitch_deck(idea_struct: dict, research_results: dict, branding_content: dict, output_path: str):
-    """Create pitch deck PowerPoint presentation."""
+Key Metrics:
+• Customer Acquisition Cost: TBD
+• Lifetime Value: TBD
+• Gross Margin: 70%+"""
+
+ASK_PARAGRAPHS = [
+    ("\n\nThe Ask:", 0),
+    ("Seeking $500K seed funding for:", 1),
+    ("• Product development & MVP launch", 2),
+    ("• Initial marketing & user acquisition", 2),
+    ("• Team expansion", 2),
+]
+
+BRAND_COLOR = RGBColor(0x2C, 0x3E, 0x50)
+
+# Serialized deck template, built or read once per process
+_deck_template: Optional[bytes] = None
+_deck_template_lock = threading.Lock()
+
+
+def _build_deck_template() -> bytes:
+    """Build the default branded deck: every slide, title and static text in
+    place, with the per-idea placeholders left empty."""
     prs = Presentation()
     prs.slide_width = Inches(10)
     prs.slide_height = Inches(7.5)
     
-    pitch_sections = branding_content.get("pitch_sections", {})
+    for index, title in enumerate(DECK_SLIDE_TITLES):
+        # Title slide layout first, then title and content
+        slide = prs.slides.add_slide(prs.slide_layouts[0 if index == 0 else 1])
+        bar = slide.shapes.add_shape(MSO_SHAPE.RECTANGLE, 0, 0, prs.slide_width, Inches(0.25))
+        bar.fill.solid()
+        bar.fill.fore_color.rgb = BRAND_COLOR
+        bar.line.fill.background()
+        if title:
+            slide.shapes.title.text = title
+    
+    prs.slides[5].placeholders[1].text_frame.text = FINANCIALS_TEXT
+    tf = prs.slides[6].placeholders[1].text_frame
+    for text, level in ASK_PARAGRAPHS:
+        p = tf.add_paragraph()
+        p.text = text
+        p.level = level
+    
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def _load_deck_template() -> bytes:
+    """The configured PITCH_DECK_TEMPLATE, or the built-in template if it is
+    unset, unreadable or does not have one slide per filler."""
+    path = get_settings().pitch_deck_template
+    if path:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            slides = len(Presentation(io.BytesIO(data)).slides)
+            if slides == len(SLIDE_FILLERS):
+                return data
+            print(f"⚠ Pitch deck template {path} has {slides} slides, expected {len(SLIDE_FILLERS)}; using the built-in template")
+        except Exception as e:
+            print(f"⚠ Could not load pitch deck template {path}: {e}; using the built-in template")
+    return _build_deck_template()
+
+
+def get_deck_template() -> bytes:
+    """Serialized deck template, loaded once per process."""
+    global _deck_template
+    if _deck_template is None:
+        with _deck_template_lock:
+            if _deck_template is None:
+                _deck_template = _load_deck_template()
+    return _deck_template
+
+
+def _fill_title_slide(slide, idea_struct: dict, research_results: dict, branding_content: dict):
     brand_names = branding_content.get("brand_names", [])
     slogans = branding_content.get("slogans", [])
-    
-    # Slide 1: Title slide
-    slide = prs.slides.add_slide(prs.slide_layouts[0])  # Title slide layout
-    title = slide.shapes.title
-    subtitle = slide.placeholders[1]
-    
-    title.text = brand_names[0] if brand_names else "Startup Idea"
-    subtitle.text = slogans[0] if slogans else "Innovative Solution"
-    
-    # Slide 2: Problem
-    slide = prs.slides.add_slide(prs.slide_layouts[1])  # Title and content
-    title = slide.shapes.title
-    content = slide.placeholders[1]
-    
-    title.text = "The Problem"
-    tf = content.text_frame
-    tf.text = pitch_sections.get("problem", "Market problem statement")
-    
-    # Slide 3: Solution
-    slide = prs.slides.add_slide(prs.slide_layouts[1])
-    title = slide.shapes.title
-    content = slide.placeholders[1]
-    
-    title.text = "Our Solution"
-    tf = content.text_frame
-    tf.text = pitch_sections.get("solution", "Solution description")
-    
-    # Slide 4: Market & Trends
-    slide = prs.slides.add_slide(prs.slide_layouts[1])
-    title = slide.shapes.title
-    content = slide.placeholders[1]
-    
-    title.text = "Market Opportunity"
-    tf = content.text_frame
+    slide.shapes.title.text = brand_names[0] if brand_names else "Startup Idea"
+    slide.placeholders[1].text = slogans[0] if slogans else "Innovative Solution"
+
+
+def _pitch_section_filler(section: str, default: str):
+    """Filler that puts one pitch section into the slide's body placeholder."""
+    def fill(slide, idea_struct: dict, research_results: dict, branding_content: dict):
+        pitch_sections = branding_content.get("pitch_sections", {})
+        slide.placeholders[1].text_frame.text = pitch_sections.get(section, default)
+    return fill
+
+
+def _fill_market_slide(slide, idea_struct: dict, research_results: dict, branding_content: dict):
+    pitch_sections = branding_content.get("pitch_sections", {})
+    tf = slide.placeholders[1].text_frame
     
     # Add market size
-    p = tf.paragraphs[0]
-    p.text = pitch_sections.get("market_size_estimate", "Market analysis")
+    tf.text = pitch_sections.get("market_size_estimate", "Market analysis")
     
     # Add competitors
     competitors = research_results.get("competitors", [])
@@ -101,70 +470,71 @@ def _create_pitch_deck(idea_struct: dict, research_results: dict, branding_conte
             p = tf.add_paragraph()
             p.text = f"• {comp.get('name', 'Unknown')}"
             p.level = 1
-    
-    # Slide 5: Business Model
-    slide = prs.slides.add_slide(prs.slide_layouts[1])
-    title = slide.shapes.title
-    content = slide.placeholders[1]
-    
-    title.text = "Business Model"
-    tf = content.text_frame
-    tf.text = pitch_sections.get("business_model", "Revenue model")
-    
-    # Slide 6: Financials Placeholder
-    slide = prs.slides.add_slide(prs.slide_layouts[1])
-    title = slide.shapes.title
-    content = slide.placeholders[1]
-    
-    title.text = "Financial Projections"
-    tf = content.text_frame
-    tf.text = """Year 1: $100K ARR (projected)
-Year 2: $500K ARR (projected)
-Year 3: $2M ARR (projected)
 
-Key Metrics:
-• Customer Acquisition Cost: TBD
-• Lifetime Value: TBD
-• Gross Margin: 70%+"""
-    
-    # Slide 7: Team & Ask
-    slide = prs.slides.add_slide(prs.slide_layouts[1])
-    title = slide.shapes.title
-    content = slide.placeholders[1]
-    
-    title.text = "Team & The Ask"
-    tf = content.text_frame
-    
-    p = tf.paragraphs[0]
-    p.text = pitch_sections.get("team_reqs", "Team requirements")
-    
-    p = tf.add_paragraph()
-    p.text = "\n\nThe Ask:"
-    p.level = 0
+
+def _fill_financials_slide(slide, idea_struct: dict, research_results: dict, branding_content: dict):
+    # Static projections come from the template
+    pass
+
+
+def _fill_team_slide(slide, idea_struct: dict, research_results: dict, branding_content: dict):
+    pitch_sections = branding_content.get("pitch_sections", {})
+    # The template's first body paragraph is reserved for team requirements;
+    # the ask that follows it is static
+    slide.placeholders[1].text_frame.paragraphs[0].text = pitch_sections.get("team_reqs", "Team requirements")
+
+
+# One filler per template slide, in slide order
+SLIDE_FILLERS = [
+    _fill_title_slide,
+    _pitch_section_filler("problem", "Market problem statement"),
+    _pitch_section_filler("solution", "Solution description"),
+    _fill_market_slide,
+    _pitch_section_filler("business_model", "Revenue model"),
+    _fill_financials_slide,
+    _fill_team_slide,
+]
+
+
+def _create_pitch_deck(idea_struct: dict, research_results: dict, branding_content: dict) -> bytes:
+    """Create pitch deck PowerPoint presentation.
     
-    p = tf.add_paragraph()
-    p.text = "Seeking $500K seed funding for:"
-    p.level = 1
+    Clones the cached deck template in memory and fills in the per-idea
+    text; slide layout, static text and styling come from the template.
     
-    p = tf.add_paragraph()
-    p.text = "• Product development & MVP launch"
-    p.level = 2
+    Returns:
+        The .pptx file contents
+    """
+    prs = Presentation(io.BytesIO(get_deck_template()))
+    for slide, fill in zip(prs.slides, SLIDE_FILLERS):
+        fill(slide, idea_struct, research_results, branding_content)
     
-    p = tf.add_paragraph()
-    p.text = "• Initial marketing & user acquisition"
-    p.level = 2
+    # Save presentation
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+
+def _update_pitch_deck(deck: bytes, slides: List[int], idea_struct: dict, research_results: dict,
+                       branding_content: dict) -> bytes:
+    """Refill only ``slides`` (indexes into SLIDE_FILLERS) of an existing deck.
     
-    p = tf.add_paragraph()
-    p.text = "• Team expansion"
-    p.level = 2
+    Returns:
+        The updated .pptx file contents
+    """
+    prs = Presentation(io.BytesIO(deck))
+    for index in slides:
+        SLIDE_FILLERS[index](prs.slides[index], idea_struct, research_results, branding_content)
     
-    # Save presentation
-    prs.save(output_path)
+    buffer = io.BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
 
 
-def _create_summary_pdf(idea_struct: dict, research_results: dict, branding_content: dict, output_path: str):
-    """Create one-page summary PDF."""
-    doc = SimpleDocTemplate(output_path, pagesize=letter)
+def _create_summary_pdf(idea_struct: dict, research_results: dict, branding_content: dict) -> bytes:
+    """Create one-page summary PDF and return its contents."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
     styles = getSampleStyleSheet()
     story = []
     
@@ -225,10 +595,11 @@ def _create_summary_pdf(idea_struct: dict, research_results: dict, branding_cont
     
     # Build PDF
     doc.build(story)
+    return buffer.getvalue()
 
 
-def _save_assets_json(branding_content: dict, output_path: str):
-    """Save branding assets as JSON."""
+def _create_assets_json(branding_content: dict) -> bytes:
+    """Serialize branding assets as JSON."""
     assets = {
         "brand_names": branding_content.get("brand_names", []),
         "slogans": branding_content.get("slogans", []),
@@ -237,19 +608,38 @@ def _save_assets_json(branding_content: dict, output_path: str):
         "pitch_sections": branding_content.get("pitch_sections", {})
     }
     
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(assets, f, indent=2, ensure_ascii=False)
+    return json.dumps(assets, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def _zip_is_current(zip_path: str, output_dir: str) -> bool:
+    """Whether the zip exists and is at least as new as every file it packs.
+
+    In-progress ``.tmp`` writes are not packed, so they are ignored here too.
+    """
+    if not os.path.exists(zip_path):
+        return False
+    zip_mtime = os.path.getmtime(zip_path)
+    for root, dirs, files in os.walk(output_dir):
+        for file in files:
+            if file.endswith(".tmp"):
+                continue
+            if os.path.getmtime(os.path.join(root, file)) > zip_mtime:
+                return False
+    return True
 
 
 def create_downloadable_zip(job_id: str, base_output_dir: str = "outputs") -> str:
     """Create a zip file of the job output directory.
     
+    The zip written during assembly is reused as long as no file in the
+    output directory has changed since; otherwise it is rebuilt.
+    
     Args:
         job_id: Job identifier
         base_output_dir: Base directory where outputs are stored
         
     Returns:
-        Path to the created zip file
+        Path to the zip file
     """
     output_dir = os.path.join(base_output_dir, job_id)
     zip_path = os.path.join(base_output_dir, f"{job_id}.zip")
@@ -257,11 +647,16 @@ def create_downloadable_zip(job_id: str, base_output_dir: str = "outputs") -> st
     if not os.path.exists(output_dir):
         raise FileNotFoundError(f"Output directory not found: {output_dir}")
     
-    with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+    if _zip_is_current(zip_path, output_dir):
+        return zip_path
+    
+    with _replacing(zip_path) as tmp_zip, zipfile.ZipFile(tmp_zip, 'w') as zipf:
         for root, dirs, files in os.walk(output_dir):
             for file in files:
+                if file.endswith(".tmp"):
+                    continue
                 file_path = os.path.join(root, file)
                 arcname = os.path.relpath(file_path, output_dir)
-                zipf.write(file_path, arcname)
+                zipf.write(file_path, arcname, compress_type=_compress_type(file))
     
     return zip_path
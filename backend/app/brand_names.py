@@ -0,0 +1,326 @@
+"""Rule-based brand name candidates with collision checks.
+
+Thousands of candidates are built from morphemes: the industry and
+audience words, a few industry synonyms, and common brand prefixes and
+suffixes. They are scored in one vectorized pass with the same length,
+vowel-ratio and keyword heuristics as ``generator_agent._score_name``.
+Names already in use are dropped with a Bloom filter built from a local
+list of existing company and product names (``EXISTING_NAMES_PATH``,
+one name per line). The filter is saved next to the list, so later
+processes load it in milliseconds instead of rebuilding it.
+"""
+import hashlib
+import math
+import os
+import re
+import struct
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .config import get_settings
+
+
+PREFIXES = ["My", "Get", "The", "Quick", "Easy", "Smart", "Pro", "Go", "Up", "Neo", "True", "Bright",
+            "Om", "Evo", "Zen", "Nova"]
+SUFFIXES = ["ly", "ify", "io", "ora", "eo", "a", "ia", "ara", "Hub", "Pro", "Go", "Now", "App", "Plus",
+            "Zone", "Spot", "Nest", "Wise", "Base", "Lab", "Loop", "Path", "Works", "Mate"]
+
+# Related stems per industry keyword; unknown industries use only their own words
+SYNONYMS: Dict[str, List[str]] = {
+    "grocery": ["fresh", "cart", "basket", "pantry", "market", "harvest"],
+    "food": ["plate", "feast", "bite", "dish", "fresh", "kitchen"],
+    "fitness": ["fit", "pulse", "stride", "move", "vital", "strong"],
+    "health": ["care", "vital", "well", "cure", "pulse", "thrive"],
+    "healthcare": ["care", "vital", "well", "cure", "pulse", "thrive"],
+    "education": ["learn", "mentor", "scholar", "study", "skill", "bright"],
+    "learning": ["learn", "mentor", "study", "skill", "tutor", "mind"],
+    "finance": ["coin", "fund", "ledger", "vault", "wealth", "pay"],
+    "fintech": ["coin", "fund", "ledger", "vault", "pay", "mint"],
+    "travel": ["trip", "voyage", "journey", "roam", "wander", "atlas"],
+    "agriculture": ["farm", "field", "harvest", "crop", "seed", "soil"],
+    "logistics": ["route", "cargo", "ship", "freight", "relay", "dock"],
+    "fashion": ["style", "thread", "vogue", "wear", "chic", "tailor"],
+    "music": ["tune", "beat", "chord", "melody", "rhythm", "sound"],
+    "delivery": ["drop", "dash", "parcel", "courier", "swift", "relay"],
+    "pet": ["paw", "tail", "fetch", "purr", "buddy", "whisker"],
+    "real": ["home", "nest", "key", "dwell", "haven", "estate"],
+    "tech": ["byte", "logic", "pixel", "spark", "code", "nova"],
+}
+
+# Words that make poor brand stems
+_STOP_STEMS = frozenset(["and", "for", "the", "with", "people", "users", "general", "public", "areas", "area"])
+_VOWELS = np.frombuffer(b"aeiou", dtype=np.uint8)
+
+# Keep the top names varied: no stem is used by more than this many of them
+MAX_PER_STEM = 3
+# Candidates checked against the existing-name filter at a time
+CHECK_CHUNK_SIZE = 256
+
+
+def _normalize_name(name: str) -> str:
+    """Canonical form used for collision checks: lowercase letters and digits only."""
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+class BloomFilter:
+    """Compact probabilistic set of strings (false positives only).
+
+    Uses double hashing of a single BLAKE2b digest to derive the ``k``
+    bit positions, so adding or checking a name costs one hash.
+    """
+
+    _HEADER = struct.Struct("<4sQQQ")
+    _MAGIC = b"BLM1"
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: Optional[np.ndarray] = None, count: int = 0):
+        self.num_bits = max(8, num_bits)
+        self.num_hashes = max(1, num_hashes)
+        self.bits = bits if bits is not None else np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, capacity: int, error_rate: float) -> "BloomFilter":
+        capacity = max(1, capacity)
+        num_bits = int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / capacity * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, items: List[str]) -> np.ndarray:
+        """Bit positions for each item, shape ``(len(items), num_hashes)``."""
+        digests = b"".join(hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest() for item in items)
+        hashes = np.frombuffer(digests, dtype="<u8").reshape(len(items), 2)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            positions = hashes[:, :1] + steps * (hashes[:, 1:] | np.uint64(1))
+        return positions % np.uint64(self.num_bits)
+
+    def add_many(self, items: List[str]) -> None:
+        if not items:
+            return
+        positions = self._positions(items).ravel()
+        np.bitwise_or.at(self.bits, (positions >> np.uint64(3)).astype(np.int64),
+                         np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8))
+        self.count += len(items)
+
+    def add(self, item: str) -> None:
+        self.add_many([item])
+
+    def contains_many(self, items: List[str]) -> np.ndarray:
+        """Boolean membership for each item (may be a false positive)."""
+        if not items:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(items)
+        bytes_ = self.bits[(positions >> np.uint64(3)).astype(np.int64)]
+        masks = np.left_shift(1, (positions & np.uint64(7)).astype(np.uint8)).astype(np.uint8)
+        return np.all(bytes_ & masks, axis=1)
+
+    def __contains__(self, item: str) -> bool:
+        return bool(self.contains_many([item])[0])
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(self._HEADER.pack(self._MAGIC, self.num_bits, self.num_hashes, self.count))
+            f.write(self.bits.tobytes())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "BloomFilter":
+        with open(path, "rb") as f:
+            magic, num_bits, num_hashes, count = cls._HEADER.unpack(f.read(cls._HEADER.size))
+            if magic != cls._MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            bits = np.frombuffer(f.read(), dtype=np.uint8).copy()
+        return cls(num_bits, num_hashes, bits, count)
+
+    @property
+    def size_bytes(self) -> int:
+        return int(self.bits.nbytes)
+
+
+_filter: Optional[BloomFilter] = None
+_filter_state = "not_loaded"
+_filter_lock = threading.Lock()
+
+
+def build_filter(names: Iterable[str], capacity: int, error_rate: float,
+                 chunk_size: int = 100000) -> BloomFilter:
+    """Build a filter sized for ``capacity`` names, hashing them in chunks."""
+    bloom = BloomFilter.for_capacity(capacity, error_rate)
+    chunk: List[str] = []
+    for name in names:
+        normalized = _normalize_name(name)
+        if normalized:
+            chunk.append(normalized)
+        if len(chunk) >= chunk_size:
+            bloom.add_many(chunk)
+            chunk = []
+    bloom.add_many(chunk)
+    return bloom
+
+
+def get_existing_names_filter() -> Optional[BloomFilter]:
+    """Return the filter of names in use, building or loading it on first use.
+
+    Returns None when no ``EXISTING_NAMES_PATH`` is configured or the
+    list cannot be read; collision checks are skipped in that case.
+    """
+    global _filter, _filter_state
+    if _filter_state != "not_loaded":
+        return _filter
+
+    with _filter_lock:
+        if _filter_state != "not_loaded":
+            return _filter
+
+        settings = get_settings()
+        source = settings.existing_names_path
+        if not source:
+            _filter_state = "disabled"
+            return None
+
+        cache_path = f"{source}.bloom"
+        try:
+            if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(source):
+                _filter = BloomFilter.load(cache_path)
+            else:
+                with open(source, encoding="utf-8", errors="ignore") as f:
+                    capacity = sum(1 for _ in f)
+                with open(source, encoding="utf-8", errors="ignore") as f:
+                    _filter = build_filter(f, capacity, settings.existing_names_error_rate)
+                try:
+                    _filter.save(cache_path)
+                except OSError as e:
+                    print(f"⚠ Could not save name filter to {cache_path}: {e}")
+            _filter_state = "ready"
+            print(f"✓ Existing-name filter ready ({_filter.count} names, {_filter.size_bytes // 1024} KB)")
+        except (OSError, ValueError) as e:
+            print(f"⚠ Existing-name list not available: {e}")
+            _filter = None
+            _filter_state = "unavailable"
+
+    return _filter
+
+
+def is_claimed(name: str) -> bool:
+    """Whether ``name`` (probably) matches an existing company or product name."""
+    bloom = get_existing_names_filter()
+    return bloom is not None and _normalize_name(name) in bloom
+
+
+def _stems(industry: str, audience: str) -> List[str]:
+    words = [w for w in re.findall(r"[a-z]+", f"{industry} {audience}".lower()) if len(w) > 2]
+    stems = [w for w in words if w not in _STOP_STEMS]
+    for word in list(stems):
+        stems.extend(SYNONYMS.get(word, []))
+    return list(dict.fromkeys(stems)) or ["smart"]
+
+
+def generate_candidates(industry: str, audience: str) -> Tuple[List[str], List[Tuple[str, ...]]]:
+    """All prefix, suffix, compound and blend combinations for an idea.
+
+    Returns:
+        (names, stems each name was built from), in generation order
+    """
+    stems = [s.capitalize() for s in _stems(industry, audience)]
+    built: Dict[str, Tuple[str, ...]] = {}
+
+    def add(name: str, *sources: str) -> None:
+        built.setdefault(name, sources)
+
+    for stem in stems:
+        for suffix in SUFFIXES:
+            add(f"{stem}{suffix}", stem)
+        for prefix in PREFIXES:
+            add(f"{prefix}{stem}", stem)
+            for suffix in SUFFIXES:
+                add(f"{prefix}{stem}{suffix}", stem)
+        # Blends: clip the stem before a vowel-led suffix (Harvest + ora -> Harvora)
+        for cut in range(3, len(stem)):
+            for suffix in SUFFIXES:
+                if suffix[0] in "aeio":
+                    add(f"{stem[:cut]}{suffix}", stem)
+    for first in stems:
+        for second in stems:
+            if first != second:
+                add(f"{first}{second}", first, second)
+                add(f"{first[:4]}{second.lower()}", first, second)
+    return list(built), list(built.values())
+
+
+def score_candidates(names: List[str], industry: str) -> np.ndarray:
+    """Vectorized version of ``generator_agent._score_name`` for many names."""
+    if not names:
+        return np.zeros(0, dtype=np.int64)
+    lowered = np.array([n.lower() for n in names])
+    lengths = np.char.str_len(lowered)
+
+    width = int(lengths.max())
+    encoded = np.frombuffer(
+        b"".join(n.encode("ascii", "replace").ljust(width, b"\0") for n in lowered), dtype=np.uint8
+    ).reshape(len(names), width)
+    vowel_ratio = np.isin(encoded, _VOWELS).sum(axis=1) / np.maximum(lengths, 1)
+
+    scores = np.where((lengths >= 6) & (lengths <= 12), 3, np.where((lengths >= 4) & (lengths <= 15), 1, 0))
+    scores = scores + 2 * (np.char.find(lowered, industry.lower()) >= 0)
+    scores = scores + 2 * ((vowel_ratio >= 0.3) & (vowel_ratio <= 0.5))
+    scores = scores + np.char.isalnum(np.array(names))
+    return scores
+
+
+def unclaimed(names: List[str]) -> List[str]:
+    """Drop names that (probably) match an existing company or product."""
+    bloom = get_existing_names_filter()
+    if bloom is None or not names:
+        return list(names)
+    claimed = bloom.contains_many([_normalize_name(name) for name in names])
+    return [name for name, taken in zip(names, claimed) if not taken]
+
+
+def top_names(industry: str, audience: str, count: int = 10, exclude: Iterable[str] = ()) -> List[str]:
+    """Best-scoring unclaimed candidates, preferring at most ``MAX_PER_STEM`` per stem.
+
+    Candidates are checked against the existing-name filter in score
+    order, a chunk at a time, so usually only the first few hundred are
+    hashed. If the stem limit leaves fewer than ``count`` names (ideas
+    with very few stems), the remaining slots are filled without it.
+    Names in ``exclude`` (e.g. ones already shown) are skipped.
+    """
+    names, sources = generate_candidates(industry, audience)
+    scores = score_candidates(names, industry)
+    # Stable sort keeps generation order among equal scores, so results are deterministic
+    order = np.argsort(-scores, kind="stable")
+
+    chosen: List[str] = []
+    skipped: List[str] = []
+    per_stem: Dict[str, int] = {}
+    seen = {_normalize_name(name) for name in exclude}
+    for start in range(0, len(order), CHECK_CHUNK_SIZE):
+        chunk = [names[i] for i in order[start:start + CHECK_CHUNK_SIZE]]
+        stems_of = {names[i]: sources[i] for i in order[start:start + CHECK_CHUNK_SIZE]}
+        for name in unclaimed(chunk):
+            normalized = _normalize_name(name)
+            if normalized in seen:
+                continue
+            seen.add(normalized)
+            stems = stems_of[name]
+            if any(per_stem.get(stem, 0) >= MAX_PER_STEM for stem in stems):
+                skipped.append(name)
+                continue
+            for stem in stems:
+                per_stem[stem] = per_stem.get(stem, 0) + 1
+            chosen.append(name)
+            if len(chosen) == count:
+                return chosen
+    return chosen + skipped[:count - len(chosen)]
+
+
+def filter_status() -> Dict[str, Any]:
+    """State and size of the existing-name filter, for stats."""
+    return {
+        "state": _filter_state,
+        "names": _filter.count if _filter is not None else 0,
+        "size_bytes": _filter.size_bytes if _filter is not None else 0,
+    }
@@ -1,6 +1,6 @@
 """Configuration management for the application."""
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -20,6 +20,27 @@ class Settings(BaseSettings):
     openrouter_model: str = "openai/gpt-oss-120b:free"
     openrouter_base_url: str = "https://openrouter.ai/api/v1/chat/completions"
     
+    # LLM call resilience
+    llm_timeout_seconds: float = 30.0  # per attempt
+    llm_deadline_seconds: float = 90.0  # per call, across all retries
+    llm_max_retries: int = 3
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 20.0
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_seconds: float = 60.0
+    
+    # LLM client-side rate limits (requests beyond these are queued)
+    llm_requests_per_minute: float = 20.0
+    llm_burst: int = 5
+    llm_max_concurrency: int = 4
+    # Per-model overrides, e.g. {"openai/gpt-oss-120b:free": {"requests_per_minute": 10, "max_concurrency": 2}}
+    llm_model_limits: Dict[str, Dict[str, float]] = {}
+    
+    # LLM response cache (stored in the application database)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl_seconds: int = 604800  # 7 days
+    llm_cache_max_entries: int = 5000
+    
     # Server
     backend_host: str = "0.0.0.0"
     backend_port: int = 8000
@@ -36,11 +57,75 @@ class Settings(BaseSettings):
     # File Storage
     output_dir: str = "outputs"
     max_file_size_mb: int = 50
+    # "eager" renders the pitch deck, PDF and zip with every job; "lazy" stores
+    # only the generated content and renders them on the first download
+    artifact_mode: str = "eager"
+    # Processes rendering the pitch deck and summary PDF (0 = threads in the API process)
+    render_pool_size: int = 2
+    render_timeout_seconds: float = 120.0
+    # Branded .pptx with one slide per pitch deck section (title, problem, solution,
+    # market, business model, financials, team); unset uses the built-in template
+    pitch_deck_template: Optional[str] = None
     
     # AI Models
     use_openai: bool = False
     use_local_models: bool = True
     model_cache_dir: str = "./model_cache"
+    # Local text generation model, loaded lazily once per process
+    generator_model: str = "gpt2"
+    # Load it in the background at startup instead of on the first generation
+    generator_preload: bool = True
+    # CPU inference backend: "torch" (fp32), "torch-int8" (dynamic quantization)
+    # or "onnx" (ONNX Runtime, needs optimum[onnxruntime])
+    generator_backend: str = "torch"
+    # Concurrent generations are gathered for this long and run as one batch (0 = off)
+    gen_batch_window_ms: float = 10.0
+    gen_max_batch_size: int = 8
+    # Per-section generation cache keyed by industry, audience and features
+    generation_cache_size: int = 1024
+    generation_cache_persist: bool = True
+    generation_cache_ttl_seconds: int = 604800  # 7 days
+    # Part of every generation cache key; change it to start a fresh set of variations
+    generator_seed: int = 0
+    # Existing company/product names (one per line); generated brand names that
+    # match one are dropped. A Bloom filter is cached next to it as <path>.bloom
+    existing_names_path: Optional[str] = None
+    existing_names_error_rate: float = 0.001
+    # "sections" runs each generator separately; "consolidated" asks the LLM
+    # for every branding section in one call (requires USE_OPENAI)
+    generation_mode: str = "sections"
+    # "spacy" (falls back to rules if unavailable) or "rules" for the fast rule parser
+    nlp_mode: str = "spacy"
+    spacy_model: str = "en_core_web_sm"
+    # Components parse_idea never reads (it uses POS tags, the dependency parse,
+    # noun chunks and entities)
+    spacy_exclude: List[str] = ["lemmatizer"]
+    spacy_batch_size: int = 64
+    spacy_n_process: int = 1
+    # Memo of parse_idea results (in memory, optionally persisted to the cache table)
+    parse_memo_size: int = 4096
+    parse_memo_persist: bool = True
+    parse_memo_ttl_seconds: int = 2592000  # 30 days
+    # Download the spaCy model on first use if missing (the Docker image ships it)
+    spacy_auto_download: bool = False
+    
+    # CPU worker pool for spaCy parsing and local generation (0 = run in the API process)
+    cpu_pool_size: int = 0
+    cpu_pool_max_pending: int = 16
+    cpu_pool_parse_timeout_seconds: float = 30.0
+    cpu_pool_generate_timeout_seconds: float = 600.0
+    # torch/BLAS threads per process (0 = available cores // pool size)
+    cpu_threads_per_worker: int = 0
+    cpu_interop_threads: int = 1
+    # Pin each pool worker to its own cores (Linux only)
+    cpu_affinity: bool = False
+    
+    # Research summarization
+    # "auto" uses the LLM when configured, "extractive" always summarizes locally
+    summarizer_mode: str = "auto"
+    summary_max_sentences: int = 6
+    # Token budget for research text packed into LLM prompts
+    llm_context_tokens: int = 400
     
     class Config:
         env_file = ".env"
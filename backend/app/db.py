@@ -1,7 +1,7 @@
 """Database setup using SQLAlchemy with SQLite."""
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from .models import Base, User, Idea, Output, Cache
+from .models import Base, User, Idea, Output, Cache, LLMCacheEntry
 import os
 
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./startify.db")
@@ -78,3 +78,20 @@ def save_output(idea_id: int, output_type: str, content: dict, file_path: str):
         db.commit()
     finally:
         db.close()
+
+
+def update_output(idea_id: int, output_type: str, content: dict):
+    """Replace the content of an idea's latest output of ``output_type``."""
+    db = SessionLocal()
+    try:
+        output = (
+            db.query(Output)
+            .filter(Output.idea_id == idea_id, Output.output_type == output_type)
+            .order_by(Output.id.desc())
+            .first()
+        )
+        if output:
+            output.content_json = content
+            db.commit()
+    finally:
+        db.close()
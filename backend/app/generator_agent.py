@@ -1,16 +1,38 @@
 """GeneratorAgent: generates branding and content using AI models."""
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+import contextvars
+import copy
+import hashlib
+import json
 import re
+import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
-# Optional: HuggingFace text generation
-try:
-    from transformers import pipeline
-    text_generator = pipeline("text-generation", model="gpt2")
-    GENERATOR_AVAILABLE = True
-except Exception as e:
-    print(f"Text generator not available: {e}")
-    GENERATOR_AVAILABLE = False
+from pydantic import BaseModel, TypeAdapter, ValidationError, conlist, constr
+
+from . import brand_names as brand_name_engine
+from . import text_model
+from .config import get_settings
+from .llm_client import generate_text_sync, is_llm_configured
+from .utils import LRUCache, get_cached, set_cache
+
+# Bump when prompts, sampling settings or filters change; cached sections
+# from older versions are ignored
+GENERATOR_VERSION = "2"
+
+# Sections generated with the local text model; their cache keys record
+# which model produced them so template fallbacks are not served later
+MODEL_SECTIONS = ("brand_names", "slogans", "ad_copies")
+
+# Set by section generators when the local text model produced their
+# result; read through _with_source
+_section_source: contextvars.ContextVar = contextvars.ContextVar("section_source", default="template")
+
+# Per-section results keyed by canonical idea attributes (see _section_cache_key)
+_section_cache: Optional[LRUCache] = None
+_persisted_hits = 0
 
 
 # Prompt templates for different content types
@@ -33,13 +55,68 @@ The problem:"""
 PITCH_SOLUTION_PROMPT = """Solution for {industry} app with features {features}:
 Our solution:"""
 
+CONSOLIDATED_PROMPT = """You are a startup branding strategist. Create the branding and pitch content for this startup.
+
+Idea: {raw}
+Industry: {industry}
+Target audience: {audience}
+Features: {features}
+Key opportunities: {opportunities}
+Key risks: {risks}
+
+Respond with ONLY a JSON object (no markdown, no commentary) with exactly these keys:
+- "brand_names": 10 short, pronounceable brand names
+- "slogans": 5 slogans of 3-8 words
+- "logo_prompts": 5 image-generation prompts describing a logo
+- "ad_copies": 5 social media ads of at most 30 words
+- "pitch_sections": an object with the keys "problem", "solution", "value_proposition",
+  "business_model", "market_size_estimate", "go_to_market" and "team_reqs",
+  each 2-5 sentences of plain text"""
+
+# Sections of branding_content, each generated (and cached) independently
+BRANDING_SECTIONS = ("brand_names", "slogans", "logo_prompts", "ad_copies", "pitch_sections")
+
+# List sections whose generators can avoid items shown before (``exclude``)
+EXCLUDABLE_SECTIONS = ("brand_names", "slogans", "ad_copies")
+
+# Number of items kept per list section
+SECTION_COUNTS = {"brand_names": 10, "slogans": 5, "logo_prompts": 5, "ad_copies": 5}
+
+
+class PitchSectionsSchema(BaseModel):
+    problem: constr(strip_whitespace=True, min_length=20)
+    solution: constr(strip_whitespace=True, min_length=20)
+    value_proposition: constr(strip_whitespace=True, min_length=20)
+    business_model: constr(strip_whitespace=True, min_length=20)
+    market_size_estimate: constr(strip_whitespace=True, min_length=20)
+    go_to_market: constr(strip_whitespace=True, min_length=20)
+    team_reqs: constr(strip_whitespace=True, min_length=20)
+
+
+# Each section is validated on its own so one bad section does not discard the rest
+SECTION_SCHEMAS = {
+    "brand_names": TypeAdapter(conlist(constr(strip_whitespace=True, min_length=2, max_length=40), min_length=10)),
+    "slogans": TypeAdapter(conlist(constr(strip_whitespace=True, min_length=5, max_length=120), min_length=5)),
+    "logo_prompts": TypeAdapter(conlist(constr(strip_whitespace=True, min_length=10, max_length=400), min_length=5)),
+    "ad_copies": TypeAdapter(conlist(constr(strip_whitespace=True, min_length=10, max_length=400), min_length=5)),
+    "pitch_sections": TypeAdapter(PitchSectionsSchema),
+}
+
 
-def generate_branding_and_content(idea_struct: dict, research_results: dict) -> dict:
+def generate_branding_and_content(idea_struct: dict, research_results: dict, fresh: bool = False,
+                                  consolidated: Optional[Dict[str, Any]] = None) -> dict:
     """Generate comprehensive branding and content for a startup idea.
     
+    Sections are cached by industry, audience and features, so a later
+    job for an equivalent idea reuses them.
+    
     Args:
         idea_struct: Parsed idea structure with industry, target_audience, features
         research_results: Research data with competitors, trends, opportunities, risks
+        fresh: Skip cached sections (and cached LLM responses) to get new
+            variations; the new results replace the cached ones
+        consolidated: Already-fetched consolidated LLM document (see
+            fetch_consolidated_document), used in consolidated mode
         
     Returns:
         Dictionary containing:
@@ -48,95 +125,344 @@ def generate_branding_and_content(idea_struct: dict, research_results: dict) ->
         - logo_prompts: List of 5 logo generation prompts
         - ad_copies: List of 5 social media ad texts
         - pitch_sections: Dict with pitch deck sections
+        - provenance: Source of each section ("llm", "model" for the local
+          text model, or "template"), only in consolidated generation mode;
+          regenerating a section later records "regenerated:<source>"
+        - generation_timings: Seconds spent generating each section
     """
-    industry = idea_struct.get("industry", "tech")
-    audience = idea_struct.get("target_audience", "general public")
-    features = ", ".join(idea_struct.get("features", ["innovative features"]))
+    if get_settings().generation_mode == "consolidated" and is_llm_configured():
+        return _generate_consolidated(idea_struct, research_results, fresh, consolidated)
     
-    # Generate brand names
-    brand_names = _generate_brand_names(industry, audience)
+    timings: Dict[str, float] = {}
     
-    # Generate slogans
-    slogans = _generate_slogans(industry, audience, features)
+    def section(name: str) -> Any:
+        return _timed(timings, name, _generate_section, name, idea_struct, research_results, fresh)
     
-    # Generate logo prompts
-    logo_prompts = _generate_logo_prompts(industry, audience)
-    
-    # Generate ad copies
-    ad_copies = _generate_ad_copies(industry, audience, features)
+    # Run the model-backed sections concurrently; the text model batches
+    # each prompt with the same section from other jobs in flight
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="generate") as executor:
+        brand_names_future = executor.submit(section, "brand_names")
+        slogans_future = executor.submit(section, "slogans")
+        ad_copies_future = executor.submit(section, "ad_copies")
+        
+        # Generate logo prompts
+        logo_prompts = section("logo_prompts")
+        
+        brand_names = brand_names_future.result()
+        slogans = slogans_future.result()
+        ad_copies = ad_copies_future.result()
     
     # Generate pitch sections
-    pitch_sections = _generate_pitch_sections(idea_struct, research_results)
+    pitch_sections = section("pitch_sections")
     
     return {
         "brand_names": brand_names,
         "slogans": slogans,
         "logo_prompts": logo_prompts,
         "ad_copies": ad_copies,
-        "pitch_sections": pitch_sections
+        "pitch_sections": pitch_sections,
+        "generation_timings": timings
     }
 
 
-def _generate_brand_names(industry: str, audience: str) -> List[str]:
-    """Generate brand name options."""
-    prompt = BRAND_NAME_PROMPT.format(industry=industry, audience=audience)
+def regenerate_section(section: str, idea_struct: dict, research_results: dict,
+                       previous: Optional[Any] = None) -> Tuple[Any, str]:
+    """Generate a new variation of a single branding section.
+    
+    Bypasses the shared section cache in both directions: the result
+    belongs to the job being edited, so it is neither served from nor
+    stored under the key other jobs with the same attributes use. Items
+    of ``previous`` are avoided where the generator has alternatives
+    (brand names, slogans and ad copies); sections built only from fixed
+    templates come back unchanged.
+    
+    Args:
+        section: One of BRANDING_SECTIONS
+        idea_struct: Parsed idea structure
+        research_results: Research data (only pitch_sections uses it)
+        previous: The section's current content
+        
+    Returns:
+        (content, source): the section's content, shaped as in
+        generate_branding_and_content, and "model" or "template"
+    """
+    if section not in BRANDING_SECTIONS:
+        raise ValueError(f"Unknown branding section: {section}")
+    generate, *args = _section_generator(section, idea_struct, research_results)
+    if section in EXCLUDABLE_SECTIONS and isinstance(previous, list):
+        return _with_source(partial(generate, exclude=previous), *args)
+    return _with_source(generate, *args)
+
+
+def _generate_section(section: str, idea_struct: dict, research_results: dict, fresh: bool) -> Any:
+    """Generate one section through the section cache."""
+    # Snapshot once so the key and the caching decision agree even if the
+    # model finishes (or fails) loading in between
+    model_tag = text_model.model_tag() if section in MODEL_SECTIONS else None
+    key = _section_cache_key(
+        section, idea_struct, research_results if section == "pitch_sections" else None, model_tag
+    )
+    return _cached_section(key, fresh, model_tag is not None, *_section_generator(section, idea_struct, research_results))
+
+
+def _section_generator(section: str, idea_struct: dict, research_results: dict) -> Tuple[Callable[..., Any], ...]:
+    """The generator function for ``section`` followed by its arguments."""
+    industry = idea_struct.get("industry", "tech")
+    audience = idea_struct.get("target_audience", "general public")
+    features = ", ".join(idea_struct.get("features", ["innovative features"]))
+    return {
+        "brand_names": (_generate_brand_names, industry, audience),
+        "slogans": (_generate_slogans, industry, audience, features),
+        "logo_prompts": (_generate_logo_prompts, industry, audience),
+        "ad_copies": (_generate_ad_copies, industry, audience, features),
+        "pitch_sections": (_generate_pitch_sections, idea_struct, research_results),
+    }[section]
+
+
+def _timed(timings: Dict[str, float], section: str, generate: Callable[..., Any], *args: Any) -> Any:
+    """Call ``generate(*args)`` and record how long it took under ``section``."""
+    started = time.perf_counter()
+    try:
+        return generate(*args)
+    finally:
+        timings[section] = round(time.perf_counter() - started, 3)
+
+
+def _normalize_attribute(value: Any) -> str:
+    return re.sub(r'\s+', ' ', str(value or "")).strip().lower()
+
+
+def _section_cache_key(section: str, idea_struct: dict, research_results: Optional[dict] = None,
+                       model_tag: Optional[str] = None) -> str:
+    """Cache key: section, canonical idea attributes, generator version and seed.
+    
+    Features are compared as a set. Model-backed sections include the
+    configured model (``text_model.model_tag()``, "templates" when there
+    is none), and sections that also read research results (pitch
+    sections) pass them in so they are part of the key.
+    """
+    attributes = {
+        "industry": _normalize_attribute(idea_struct.get("industry", "tech")),
+        "audience": _normalize_attribute(idea_struct.get("target_audience", "general public")),
+        "features": sorted({_normalize_attribute(f) for f in idea_struct.get("features", ["innovative features"])}),
+    }
+    if section in MODEL_SECTIONS:
+        attributes["model"] = model_tag or "templates"
+    if research_results is not None:
+        attributes["research"] = {
+            "key_opportunities": research_results.get("key_opportunities", [])[:3],
+            "trends": research_results.get("trends", {}),
+        }
+    digest = hashlib.sha256(json.dumps(attributes, sort_keys=True).encode("utf-8")).hexdigest()
+    return f"generate:{GENERATOR_VERSION}:{get_settings().generator_seed}:{section}:{digest}"
+
+
+def _get_section_cache() -> LRUCache:
+    global _section_cache
+    if _section_cache is None:
+        _section_cache = LRUCache(get_settings().generation_cache_size)
+    return _section_cache
+
+
+def _cached_section(key: str, fresh: bool, model_only: bool, generate: Callable[..., Any], *args: Any) -> Any:
+    """Return the cached result for ``key``, or call ``generate(*args)`` and cache it.
     
-    if GENERATOR_AVAILABLE:
+    With ``model_only`` (keys built for the local model) only results the
+    model produced are cached; template fallbacks are returned but not
+    stored under the model's key.
+    """
+    global _persisted_hits
+    settings = get_settings()
+    cache = _get_section_cache()
+    
+    if not fresh:
+        result = cache.get(key)
+        if result is None and settings.generation_cache_persist:
+            try:
+                result = get_cached(key)
+            except Exception as e:
+                print(f"Generation cache read error: {e}")
+            if result is not None:
+                _persisted_hits += 1
+                cache.put(key, result)
+        if result is not None:
+            # Callers may modify their copy
+            return copy.deepcopy(result)
+    
+    result, source = _with_source(generate, *args)
+    if model_only and source != "model":
+        return result
+    cache.put(key, copy.deepcopy(result))
+    if settings.generation_cache_persist:
         try:
-            results = text_generator(prompt, max_length=100, num_return_sequences=3, temperature=0.9)
-            generated_names = []
-            for result in results:
-                text = result["generated_text"].replace(prompt, "").strip()
-                names = _extract_list_items(text)
-                generated_names.extend(names)
-            
-            # Filter and score
-            filtered_names = _filter_and_score_names(generated_names, industry)
-            if len(filtered_names) >= 10:
-                return filtered_names[:10]
+            set_cache(key, result, ttl_seconds=settings.generation_cache_ttl_seconds)
         except Exception as e:
-            print(f"Brand name generation error: {e}")
+            print(f"Generation cache write error: {e}")
+    return result
+
+
+def _with_source(generate: Callable[..., Any], *args: Any) -> Tuple[Any, str]:
+    """Call a section generator and report where its result came from.
     
-    # Enhanced fallback: rule-based generation with variety
-    industry_cap = industry.capitalize()
-    audience_first = audience.split()[0].capitalize() if audience else "Smart"
+    Returns:
+        (result, source) with source "model" when the local text model
+        produced it and "template" otherwise
+    """
+    def run() -> Tuple[Any, str]:
+        _section_source.set("template")
+        result = generate(*args)
+        return result, _section_source.get()
+    return contextvars.copy_context().run(run)
+
+
+def generation_cache_stats() -> Dict[str, Any]:
+    """Hit-rate metrics for the per-section generation cache."""
+    stats = _get_section_cache().stats()
+    stats["persisted_hits"] = _persisted_hits
+    stats["generator_version"] = GENERATOR_VERSION
+    return stats
+
+
+def fetch_consolidated_document(idea_struct: dict, research_results: dict, fresh: bool = False) -> Dict[str, Any]:
+    """Ask the LLM for every branding section in one call.
     
-    # Extract key words from audience for more variety
-    audience_words = [w.capitalize() for w in audience.split() if len(w) > 3][:2]
+    Kept separate from the per-section fallbacks so the LLM call can run
+    in the API process (under its rate limiter and circuit breaker) while
+    the fallbacks run in a CPU worker.
     
-    base_words = [industry_cap, audience_first] + audience_words
-    suffixes = ["ly", "ify", "Hub", "Pro", "Go", "Now", "App", "Plus", "Zone", "Spot"]
-    prefixes = ["My", "Get", "The", "Quick", "Easy", "Smart", "Pro"]
+    Returns:
+        ``document`` (the parsed JSON, empty on failure) and ``seconds``
+    """
+    prompt = CONSOLIDATED_PROMPT.format(
+        raw=idea_struct.get("raw", ""),
+        industry=idea_struct.get("industry", "tech"),
+        audience=idea_struct.get("target_audience", "general public"),
+        features=", ".join(idea_struct.get("features", ["innovative features"])),
+        opportunities="; ".join(research_results.get("key_opportunities", [])[:4]) or "n/a",
+        risks="; ".join(research_results.get("key_risks", [])[:4]) or "n/a",
+    )
+    
+    started = time.perf_counter()
+    document = {}
+    try:
+        document = _parse_json_document(generate_text_sync(prompt, max_tokens=2500, use_cache=not fresh))
+    except Exception as e:
+        print(f"Consolidated generation error, using section generators: {e}")
+    return {"document": document, "seconds": round(time.perf_counter() - started, 4)}
+
+
+def _generate_consolidated(idea_struct: dict, research_results: dict, fresh: bool = False,
+                           consolidated: Optional[Dict[str, Any]] = None) -> dict:
+    """Generate every section with a single LLM call returning one JSON document.
     
-    fallback_names = []
+    Sections that are missing or fail validation are filled in by the
+    per-section generators, and the source of each section is reported
+    under ``provenance``.
     
-    # Pattern 1: Base + Suffix
-    for base in base_words[:3]:
-        for suffix in suffixes[:4]:
-            fallback_names.append(f"{base}{suffix}")
+    Args:
+        consolidated: Result of :func:`fetch_consolidated_document` when
+            the LLM call was already made; fetched here otherwise
+    """
+    industry = idea_struct.get("industry", "tech")
+    audience = idea_struct.get("target_audience", "general public")
+    features = ", ".join(idea_struct.get("features", ["innovative features"]))
     
-    # Pattern 2: Prefix + Base
-    for prefix in prefixes[:3]:
-        for base in base_words[:2]:
-            fallback_names.append(f"{prefix}{base}")
+    if consolidated is None:
+        consolidated = fetch_consolidated_document(idea_struct, research_results, fresh)
+    document = consolidated["document"]
+    timings: Dict[str, float] = {"consolidated": consolidated["seconds"]}
+    
+    fallbacks = {
+        "brand_names": lambda: _generate_brand_names(industry, audience),
+        "slogans": lambda: _generate_slogans(industry, audience, features),
+        "logo_prompts": lambda: _generate_logo_prompts(industry, audience),
+        "ad_copies": lambda: _generate_ad_copies(industry, audience, features),
+        "pitch_sections": lambda: _generate_pitch_sections(idea_struct, research_results),
+    }
+    
+    content = {}
+    provenance = {}
+    for section, fallback in fallbacks.items():
+        value = _validate_section(section, document.get(section))
+        if value is None:
+            content[section], provenance[section] = _timed(timings, section, _with_source, fallback)
+        else:
+            content[section] = value
+            provenance[section] = "llm"
+    
+    content["provenance"] = provenance
+    content["generation_timings"] = timings
+    return content
+
+
+def _parse_json_document(text: str) -> Dict[str, Any]:
+    """Extract the JSON object from an LLM response, tolerating code fences."""
+    start = text.find("{")
+    end = text.rfind("}")
+    if start == -1 or end <= start:
+        raise ValueError("No JSON object found in LLM response")
+    document = json.loads(text[start:end + 1])
+    if not isinstance(document, dict):
+        raise ValueError("LLM response is not a JSON object")
+    return document
+
+
+def _validate_section(section: str, value: Any) -> Optional[Any]:
+    """Validate one section of the consolidated document, or return None."""
+    if value is None:
+        return None
+    try:
+        validated = SECTION_SCHEMAS[section].validate_python(value)
+    except ValidationError as e:
+        print(f"Consolidated section '{section}' failed validation: {e.error_count()} errors")
+        return None
+    
+    if isinstance(validated, PitchSectionsSchema):
+        return validated.model_dump()
+    # Drop duplicates the model repeated, then check there are still enough
+    items = list(dict.fromkeys(validated))
+    count = SECTION_COUNTS[section]
+    return items[:count] if len(items) >= count else None
+
+
+def _generate_brand_names(industry: str, audience: str, exclude: Iterable[str] = ()) -> List[str]:
+    """Generate brand name options, skipping any in ``exclude``."""
+    prompt = BRAND_NAME_PROMPT.format(industry=industry, audience=audience)
     
-    # Pattern 3: Compound names
-    if len(base_words) >= 2:
-        fallback_names.append(f"{base_words[0]}{base_words[1]}")
-        fallback_names.append(f"{base_words[1]}{base_words[0]}")
+    try:
+        results = text_model.generate(
+            prompt, max_new_tokens=80, num_return_sequences=3, temperature=0.9,
+            stop_when=partial(_has_list_items, min_items=_items_per_sequence(10, 3))
+        )
+        if results:
+            generated_names = []
+            for result in results:
+                text = result["generated_text"].replace(prompt, "").strip()
+                names = _extract_list_items(text)
+                generated_names.extend(names)
+            
+            # Filter and score, dropping names already in use
+            filtered_names = _without(brand_name_engine.unclaimed(_filter_and_score_names(generated_names, industry)), exclude)
+            if len(filtered_names) >= 10:
+                _section_source.set("model")
+                return filtered_names[:10]
+    except Exception as e:
+        print(f"Brand name generation error: {e}")
     
-    # Remove duplicates and return top 10
-    unique_names = list(dict.fromkeys(fallback_names))
-    return unique_names[:10]
+    # Fallback: best unclaimed names from the rule-based candidate engine
+    return brand_name_engine.top_names(industry, audience, count=10, exclude=exclude)
 
 
-def _generate_slogans(industry: str, audience: str, features: str) -> List[str]:
-    """Generate slogan options."""
+def _generate_slogans(industry: str, audience: str, features: str, exclude: Iterable[str] = ()) -> List[str]:
+    """Generate slogan options, preferring ones not in ``exclude``."""
     prompt = SLOGAN_PROMPT.format(industry=industry, audience=audience)
     
-    if GENERATOR_AVAILABLE:
-        try:
-            results = text_generator(prompt, max_length=80, num_return_sequences=2, temperature=0.8)
+    try:
+        results = text_model.generate(
+            prompt, max_new_tokens=60, num_return_sequences=2, temperature=0.8,
+            stop_when=partial(_has_list_items, min_items=_items_per_sequence(5, 2))
+        )
+        if results:
             generated_slogans = []
             for result in results:
                 text = result["generated_text"].replace(prompt, "").strip()
@@ -144,11 +470,12 @@ def _generate_slogans(industry: str, audience: str, features: str) -> List[str]:
                 generated_slogans.extend(slogans)
             
             # Filter and score
-            filtered_slogans = _filter_and_score_text(generated_slogans, min_words=3, max_words=8)
+            filtered_slogans = _without(_filter_and_score_text(generated_slogans, min_words=3, max_words=8), exclude)
             if len(filtered_slogans) >= 5:
+                _section_source.set("model")
                 return filtered_slogans[:5]
-        except Exception as e:
-            print(f"Slogan generation error: {e}")
+    except Exception as e:
+        print(f"Slogan generation error: {e}")
     
     # Enhanced fallback slogans with variety
     feature_list = features.split(",") if features else []
@@ -167,7 +494,7 @@ def _generate_slogans(industry: str, audience: str, features: str) -> List[str]:
         f"{first_feature.capitalize()} powered {industry}"
     ]
     
-    return templates[:5]
+    return _prefer_new(templates, exclude, 5)
 
 
 def _generate_logo_prompts(industry: str, audience: str) -> List[str]:
@@ -185,13 +512,16 @@ def _generate_logo_prompts(industry: str, audience: str) -> List[str]:
     return variations
 
 
-def _generate_ad_copies(industry: str, audience: str, features: str) -> List[str]:
-    """Generate social media ad copy."""
+def _generate_ad_copies(industry: str, audience: str, features: str, exclude: Iterable[str] = ()) -> List[str]:
+    """Generate social media ad copy, preferring ads not in ``exclude``."""
     prompt = AD_COPY_PROMPT.format(industry=industry, audience=audience, features=features)
     
-    if GENERATOR_AVAILABLE:
-        try:
-            results = text_generator(prompt, max_length=100, num_return_sequences=2, temperature=0.7)
+    try:
+        results = text_model.generate(
+            prompt, max_new_tokens=70, num_return_sequences=2, temperature=0.7,
+            stop_when=_has_sentence
+        )
+        if results:
             generated_ads = []
             for result in results:
                 text = result["generated_text"].replace(prompt, "").strip()
@@ -202,10 +532,12 @@ def _generate_ad_copies(industry: str, audience: str, features: str) -> List[str
                     if len(ad.split()) <= 30:  # Keep it short
                         generated_ads.append(ad)
             
+            generated_ads = _without(generated_ads, exclude)
             if len(generated_ads) >= 5:
+                _section_source.set("model")
                 return generated_ads[:5]
-        except Exception as e:
-            print(f"Ad copy generation error: {e}")
+    except Exception as e:
+        print(f"Ad copy generation error: {e}")
     
     # Enhanced fallback ad copies with variety
     feature_list = features.split(",") if features else ["innovative features"]
@@ -221,7 +553,7 @@ def _generate_ad_copies(industry: str, audience: str, features: str) -> List[str
         f"Why settle for less? Get {features_text} in one {industry} app. Perfect for {audience}."
     ]
     
-    return templates[:5]
+    return _prefer_new(templates, exclude, 5)
 
 
 def _generate_pitch_sections(idea_struct: dict, research_results: dict) -> Dict[str, str]:
@@ -291,6 +623,18 @@ Key channels: App stores, social media, word-of-mouth, partnerships"""
     }
 
 
+def _without(items: List[str], exclude: Iterable[str]) -> List[str]:
+    """``items`` minus those in ``exclude`` (case-insensitive), in order."""
+    excluded = {item.strip().lower() for item in exclude}
+    return [item for item in items if item.strip().lower() not in excluded]
+
+
+def _prefer_new(items: List[str], exclude: Iterable[str], count: int) -> List[str]:
+    """First ``count`` items, taking ones not in ``exclude`` before repeats."""
+    fresh = _without(items, exclude)
+    return (fresh + [item for item in items if item not in fresh])[:count]
+
+
 def _extract_list_items(text: str) -> List[str]:
     """Extract list items from generated text."""
     # Match numbered lists or bullet points
@@ -309,36 +653,59 @@ def _extract_list_items(text: str) -> List[str]:
     return items
 
 
+def _score_name(name: str, industry: str) -> int:
+    """Quality heuristic for a brand name (higher is better, 0-8)."""
+    score = 0
+    
+    # Length score (prefer 6-12 characters)
+    if 6 <= len(name) <= 12:
+        score += 3
+    elif 4 <= len(name) <= 15:
+        score += 1
+    
+    # Keyword match
+    if industry.lower() in name.lower():
+        score += 2
+    
+    # Pronounceability (simple heuristic: vowel ratio)
+    vowels = sum(1 for c in name.lower() if c in 'aeiou')
+    vowel_ratio = vowels / len(name) if len(name) > 0 else 0
+    if 0.3 <= vowel_ratio <= 0.5:
+        score += 2
+    
+    # No special characters
+    if name.isalnum():
+        score += 1
+    
+    return score
+
+
+def _items_per_sequence(needed: int, sequences: int) -> int:
+    """List items each sampled sequence should produce, with one spare for filtering."""
+    return -(-needed // sequences) + 1
+
+
+def _has_list_items(text: str, min_items: int) -> bool:
+    """Early-stopping check: ``text`` has ``min_items`` complete list items.
+    
+    Only lines already ended by a newline are counted, so an item still
+    being generated is not cut off.
+    """
+    complete = text[:text.rfind("\n") + 1]
+    return len(_extract_list_items(complete)) >= min_items
+
+
+def _has_sentence(text: str) -> bool:
+    """Early-stopping check: the first sentence (all an ad copy keeps) is complete."""
+    return bool(text.split(".", 1)[0].strip()) and "." in text
+
+
 def _filter_and_score_names(names: List[str], industry: str) -> List[str]:
     """Filter and score brand names."""
     # Remove duplicates
     unique_names = list(set(names))
     
-    scored_names = []
-    for name in unique_names:
-        score = 0
-        
-        # Length score (prefer 6-12 characters)
-        if 6 <= len(name) <= 12:
-            score += 3
-        elif 4 <= len(name) <= 15:
-            score += 1
-        
-        # Keyword match
-        if industry.lower() in name.lower():
-            score += 2
-        
-        # Pronounceability (simple heuristic: vowel ratio)
-        vowels = sum(1 for c in name.lower() if c in 'aeiou')
-        vowel_ratio = vowels / len(name) if len(name) > 0 else 0
-        if 0.3 <= vowel_ratio <= 0.5:
-            score += 2
-        
-        # No special characters
-        if name.isalnum():
-            score += 1
-        
-        scored_names.append((name, score))
+    scored_names = [(name, _score_name(name, industry)) for name in unique_names]
     
     # Sort by score descending
     scored_names.sort(key=lambda x: x[1], reverse=True)
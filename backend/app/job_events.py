@@ -0,0 +1,85 @@
+"""In-process event streams for running jobs.
+
+The background pipeline publishes stage changes, incremental text
+deltas and finished sections for a job; the ``/api/stream/{job_id}``
+endpoint replays and follows them as server-sent events. Streams are
+kept in memory for a short while after a job finishes so late
+subscribers still receive the full history.
+"""
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# How long finished streams are kept for late subscribers
+RETENTION_SECONDS = 600
+
+
+class JobStream:
+    """Append-only, thread-safe event log for one job."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: List[Tuple[str, Dict[str, Any]]] = []
+        self.closed_at: Optional[float] = None
+
+    @property
+    def closed(self) -> bool:
+        return self.closed_at is not None
+
+    def publish(self, event: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            if self.closed_at is None:
+                self._events.append((event, data))
+
+    def close(self, status: str) -> None:
+        """Publish the final ``done`` event and stop accepting new ones."""
+        with self._lock:
+            if self.closed_at is None:
+                self._events.append(("done", {"status": status}))
+                self.closed_at = time.monotonic()
+
+    def events_since(self, index: int) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            return self._events[index:]
+
+
+_streams: Dict[str, JobStream] = {}
+_streams_lock = threading.Lock()
+
+
+def _purge_expired() -> None:
+    now = time.monotonic()
+    expired = [
+        job_id for job_id, stream in _streams.items()
+        if stream.closed_at is not None and now - stream.closed_at > RETENTION_SECONDS
+    ]
+    for job_id in expired:
+        del _streams[job_id]
+
+
+def open_stream(job_id: str) -> JobStream:
+    """Create (or return) the event stream for a job."""
+    with _streams_lock:
+        _purge_expired()
+        stream = _streams.get(job_id)
+        if stream is None:
+            stream = _streams[job_id] = JobStream()
+        return stream
+
+
+def get_stream(job_id: str) -> Optional[JobStream]:
+    with _streams_lock:
+        return _streams.get(job_id)
+
+
+def publish(job_id: str, event: str, **data: Any) -> None:
+    """Publish an event to a job's stream; a no-op if nobody opened one."""
+    stream = get_stream(job_id)
+    if stream is not None:
+        stream.publish(event, data)
+
+
+def close_stream(job_id: str, status: str) -> None:
+    stream = get_stream(job_id)
+    if stream is not None:
+        stream.close(status)
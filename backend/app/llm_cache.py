@@ -0,0 +1,148 @@
+"""Persistent cache for LLM responses.
+
+Responses are stored in the application database, keyed by a hash of
+(model, system prompt, user prompt, max_tokens). Entries expire after a
+TTL and the table is trimmed to a maximum number of entries, least
+recently used first. Cache failures are logged and treated as misses so
+they never break an LLM call.
+"""
+import hashlib
+import json
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from .config import get_settings
+from .db import SessionLocal
+from .models import LLMCacheEntry
+
+
+# Trim the table only every N writes; counting rows on every put is wasteful
+EVICTION_CHECK_INTERVAL = 50
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "errors": 0}
+_writes_since_eviction = 0
+
+
+def make_key(model: str, system_prompt: str, prompt: str, max_tokens: int) -> str:
+    """Build a stable cache key for an LLM request."""
+    payload = json.dumps(
+        {"model": model, "system": system_prompt, "prompt": prompt, "max_tokens": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _count(stat: str, amount: int = 1) -> None:
+    with _stats_lock:
+        _stats[stat] += amount
+
+
+def get(key: str) -> Optional[str]:
+    """Return the cached response for ``key``, or None on miss or expiry."""
+    db = SessionLocal()
+    try:
+        entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).first()
+        if entry and entry.expires_at and entry.expires_at < datetime.now():
+            db.delete(entry)
+            db.commit()
+            entry = None
+
+        if not entry:
+            _count("misses")
+            return None
+
+        entry.last_accessed_at = datetime.now()
+        db.commit()
+        _count("hits")
+        return entry.response
+    except Exception as exc:
+        print(f"LLM cache read error: {exc}")
+        _count("errors")
+        return None
+    finally:
+        db.close()
+
+
+def put(key: str, model: str, response: str) -> None:
+    """Store a response, evicting the least recently used entries if needed."""
+    global _writes_since_eviction
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        now = datetime.now()
+        expires_at = now + timedelta(seconds=settings.llm_cache_ttl_seconds)
+
+        entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.key == key).first()
+        if entry:
+            entry.response = response
+            entry.created_at = now
+            entry.last_accessed_at = now
+            entry.expires_at = expires_at
+        else:
+            db.add(LLMCacheEntry(
+                key=key,
+                model=model,
+                response=response,
+                last_accessed_at=now,
+                expires_at=expires_at,
+            ))
+        db.commit()
+        _count("writes")
+
+        with _stats_lock:
+            _writes_since_eviction += 1
+            due = _writes_since_eviction >= EVICTION_CHECK_INTERVAL
+            if due:
+                _writes_since_eviction = 0
+        if due:
+            _evict(db, settings.llm_cache_max_entries)
+    except Exception as exc:
+        db.rollback()
+        print(f"LLM cache write error: {exc}")
+        _count("errors")
+    finally:
+        db.close()
+
+
+def _evict(db, max_entries: int) -> None:
+    """Drop expired entries, then the least recently used beyond ``max_entries``."""
+    removed = db.query(LLMCacheEntry).filter(
+        LLMCacheEntry.expires_at < datetime.now()
+    ).delete(synchronize_session=False)
+
+    overflow = db.query(LLMCacheEntry).count() - max_entries
+    if overflow > 0:
+        stale_ids = [
+            row.id for row in db.query(LLMCacheEntry.id)
+            .order_by(LLMCacheEntry.last_accessed_at.asc())
+            .limit(overflow)
+        ]
+        removed += db.query(LLMCacheEntry).filter(
+            LLMCacheEntry.id.in_(stale_ids)
+        ).delete(synchronize_session=False)
+
+    db.commit()
+    if removed:
+        _count("evictions", removed)
+
+
+def clear() -> None:
+    """Remove every cached response."""
+    db = SessionLocal()
+    try:
+        db.query(LLMCacheEntry).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def stats() -> Dict[str, Any]:
+    """Return hit/miss counters for this process."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    lookups = snapshot["hits"] + snapshot["misses"]
+    snapshot["hit_rate"] = round(snapshot["hits"] / lookups, 3) if lookups else 0.0
+    return snapshot
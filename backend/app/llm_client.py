@@ -2,84 +2,501 @@
 
 For now, this uses OpenRouter's OpenAI-compatible chat API when
 settings.use_openai is True and an OPENROUTER_API_KEY is configured.
+
+Calls are retried with jittered exponential backoff (honoring
+``Retry-After`` on 429/503) within a per-call deadline, and a shared
+circuit breaker fails calls fast after repeated upstream failures so
+callers can switch to their local fallbacks immediately. Successful
+responses are stored in a persistent cache (see :mod:`app.llm_cache`),
+and requests are paced by a shared per-model rate limiter (see
+:mod:`app.rate_limiter`).
 """
 from __future__ import annotations
 
-from typing import Any, List, Dict
+import asyncio
+import json
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
 
 import httpx
 
+from . import llm_cache
 from .config import get_settings
+from .rate_limiter import get_limiter, limiter_stats
+
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+SYSTEM_PROMPT = "You are a concise startup research assistant."
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when the LLM could not answer within the retry budget."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """Raised without calling upstream while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker shared by all LLM calls.
+
+    After ``failure_threshold`` consecutive failed attempts the breaker
+    opens and rejects calls for ``reset_timeout`` seconds. It then lets a
+    single trial call through (half-open); success closes it again,
+    failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def release_trial(self) -> None:
+        """Let another half-open trial through when the current one ended
+        without an outcome (e.g. it was cancelled)."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        """Return True if a call may be sent upstream now."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    print(f"⚠ LLM circuit breaker opened after {self._failures} failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"state": self._current_state(), "consecutive_failures": self._failures}
+
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Return the process-wide circuit breaker, creating it on first use."""
+    global _breaker
+    with _breaker_lock:
+        if _breaker is None:
+            settings = get_settings()
+            _breaker = CircuitBreaker(
+                settings.llm_breaker_failure_threshold,
+                settings.llm_breaker_reset_seconds,
+            )
+        return _breaker
+
+
+def is_llm_configured() -> bool:
+    """Return True when an external LLM is enabled and has credentials."""
+    settings = get_settings()
+    return bool(settings.use_openai and settings.openrouter_api_key)
+
+
+def _build_request(prompt: str, max_tokens: int) -> Dict[str, Any]:
+    settings = get_settings()
+    return {
+        "url": settings.openrouter_base_url,
+        "headers": {
+            "Authorization": f"Bearer {settings.openrouter_api_key}",
+            "Content-Type": "application/json",
+        },
+        "json": {
+            "model": settings.openrouter_model,
+            "messages": [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": max_tokens,
+        },
+    }
+
+
+def _parse_response(data: Dict[str, Any]) -> str:
+    try:
+        return data["choices"][0]["message"]["content"]
+    except Exception as exc:  # pragma: no cover - defensive
+        raise RuntimeError(f"Unexpected LLM response format: {data}") from exc
+
+
+def _parse_stream_line(line: str) -> Optional[str]:
+    """Return the content delta carried by one server-sent event line, if any."""
+    if not line.startswith("data:"):
+        return None
+    payload = line[len("data:"):].strip()
+    if not payload or payload == "[DONE]":
+        return None
+    try:
+        data = json.loads(payload)
+    except ValueError:
+        return None
+    choices = data.get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("delta") or {}).get("content") or None
+
+
+def _retry_after_seconds(resp: httpx.Response) -> Optional[float]:
+    """Parse a ``Retry-After`` header given in seconds or as an HTTP date."""
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _RetryState:
+    """Retry, backoff and deadline bookkeeping for a single LLM call.
+
+    Used as a context manager around the call: an attempt the breaker let
+    through that ends in an unexpected exception is recorded as a failure
+    (or, if cancelled, just releases its half-open trial), so the breaker
+    can never be left waiting for an outcome that will not come.
+    """
+
+    def __init__(self, deadline: Optional[float]):
+        settings = get_settings()
+        self.settings = settings
+        self.breaker = get_circuit_breaker()
+        self.attempts = 0
+        budget = deadline if deadline is not None else settings.llm_deadline_seconds
+        self.expires_at = time.monotonic() + budget
+
+        if not self.breaker.allow_request():
+            raise CircuitOpenError("LLM circuit breaker is open; skipping upstream call")
+        # An attempt is allowed and its outcome not yet recorded
+        self.outstanding = True
+
+    def __enter__(self) -> "_RetryState":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc is None or not self.outstanding:
+            return
+        self.outstanding = False
+        if isinstance(exc, Exception):
+            self.breaker.record_failure()
+        else:
+            # Cancellation or shutdown says nothing about upstream health
+            self.breaker.release_trial()
 
+    def queued(self, seconds: float) -> None:
+        """Time spent waiting for a rate-limit slot does not count against the deadline."""
+        self.expires_at += seconds
 
-async def generate_text(prompt: str, *, max_tokens: int = 800) -> str:
+    def attempt_timeout(self) -> float:
+        remaining = self.expires_at - time.monotonic()
+        return max(0.1, min(self.settings.llm_timeout_seconds, remaining))
+
+    def connected(self, resp: httpx.Response) -> None:
+        # Non-retryable client errors (bad key, bad request) are not an outage
+        self.outstanding = False
+        self.breaker.record_success()
+        resp.raise_for_status()
+
+    def succeeded(self, resp: httpx.Response) -> str:
+        self.connected(resp)
+        return _parse_response(resp.json())
+
+    def failed(self, error: Exception, retry_after: Optional[float] = None) -> float:
+        """Record a failed attempt and return how long to wait before retrying.
+
+        Raises :class:`LLMUnavailableError` once retries, the deadline or
+        the circuit breaker say to stop.
+        """
+        self.outstanding = False
+        self.breaker.record_failure()
+        self.attempts += 1
+
+        # Full jitter keeps concurrent callers from retrying in lockstep
+        ceiling = min(
+            self.settings.llm_backoff_max_seconds,
+            self.settings.llm_backoff_base_seconds * (2 ** (self.attempts - 1)),
+        )
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+
+        if self.attempts > self.settings.llm_max_retries:
+            reason = f"gave up after {self.attempts} attempts"
+        elif time.monotonic() + delay >= self.expires_at:
+            reason = "deadline exceeded"
+        elif not self.breaker.allow_request():
+            reason = "circuit breaker opened"
+        else:
+            print(f"LLM attempt {self.attempts} failed ({error}); retrying in {delay:.1f}s")
+            self.outstanding = True
+            return delay
+
+        raise LLMUnavailableError(f"LLM request failed, {reason}: {error}") from error
+
+
+def _status_error(resp: httpx.Response) -> httpx.HTTPStatusError:
+    return httpx.HTTPStatusError(
+        f"Upstream returned HTTP {resp.status_code}", request=resp.request, response=resp
+    )
+
+
+def _cache_key(prompt: str, max_tokens: int, use_cache: bool) -> Optional[str]:
+    settings = get_settings()
+    if not (use_cache and settings.llm_cache_enabled):
+        return None
+    return llm_cache.make_key(settings.openrouter_model, SYSTEM_PROMPT, prompt, max_tokens)
+
+
+async def _post_async(request: Dict[str, Any], deadline: Optional[float]) -> str:
+    state = _RetryState(deadline)
+    limiter = get_limiter(request["json"]["model"])
+    with state:
+        async with httpx.AsyncClient() as client:
+            while True:
+                try:
+                    async with limiter.async_slot() as waited:
+                        state.queued(waited)
+                        resp = await client.post(**request, timeout=state.attempt_timeout())
+                except httpx.TransportError as exc:
+                    delay = state.failed(exc)
+                else:
+                    if resp.status_code not in RETRYABLE_STATUS_CODES:
+                        return state.succeeded(resp)
+                    delay = state.failed(_status_error(resp), _retry_after_seconds(resp))
+                await asyncio.sleep(delay)
+
+
+def _post_sync(request: Dict[str, Any], deadline: Optional[float]) -> str:
+    state = _RetryState(deadline)
+    limiter = get_limiter(request["json"]["model"])
+    with state:
+        with httpx.Client() as client:
+            while True:
+                try:
+                    with limiter.slot() as waited:
+                        state.queued(waited)
+                        resp = client.post(**request, timeout=state.attempt_timeout())
+                except httpx.TransportError as exc:
+                    delay = state.failed(exc)
+                else:
+                    if resp.status_code not in RETRYABLE_STATUS_CODES:
+                        return state.succeeded(resp)
+                    delay = state.failed(_status_error(resp), _retry_after_seconds(resp))
+                time.sleep(delay)
+
+
+async def generate_text(prompt: str, *, max_tokens: int = 800, deadline: Optional[float] = None,
+                        use_cache: bool = True) -> str:
     """Async text generation via the configured language model.
 
     Uses OpenRouter (OpenAI-compatible chat endpoint) when enabled.
     Falls back to a simple echo if no external model is configured so
     the rest of the app does not crash.
+
+    Args:
+        prompt: User prompt to send
+        max_tokens: Maximum completion length
+        deadline: Total seconds allowed across all retries
+            (defaults to ``settings.llm_deadline_seconds``)
+        use_cache: Serve and store the response in the LLM response cache
+
+    Raises:
+        CircuitOpenError: If the circuit breaker is open
+        LLMUnavailableError: If no attempt succeeded within the budget
     """
-    settings = get_settings()
+    if not is_llm_configured():
+        return prompt[:max_tokens]
 
-    if settings.use_openai and settings.openrouter_api_key:
-        async with httpx.AsyncClient(timeout=60) as client:
-            resp = await client.post(
-                settings.openrouter_base_url,
-                headers={
-                    "Authorization": f"Bearer {settings.openrouter_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.openrouter_model,
-                    "messages": [
-                        {"role": "system", "content": "You are a concise startup research assistant."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "max_tokens": max_tokens,
-                },
-            )
-        resp.raise_for_status()
-        data = resp.json()
-        try:
-            return data["choices"][0]["message"]["content"]
-        except Exception as exc:  # pragma: no cover - defensive
-            raise RuntimeError(f"Unexpected LLM response format: {data}") from exc
+    key = _cache_key(prompt, max_tokens, use_cache)
+    if key:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            return cached
+
+    text = await _post_async(_build_request(prompt, max_tokens), deadline)
 
-    return prompt[:max_tokens]
+    if key:
+        await asyncio.to_thread(llm_cache.put, key, get_settings().openrouter_model, text)
+    return text
 
 
-def generate_text_sync(prompt: str, *, max_tokens: int = 800) -> str:
+def generate_text_sync(prompt: str, *, max_tokens: int = 800, deadline: Optional[float] = None,
+                       use_cache: bool = True) -> str:
     """Synchronous helper for text generation.
 
     This mirrors :func:`generate_text` but uses a blocking httpx.Client,
     which is easier to call from existing synchronous code such as
     research_agent.
     """
-    settings = get_settings()
+    if not is_llm_configured():
+        # Fallback behaviour when no external LLM is configured
+        return prompt[:max_tokens]
 
-    if settings.use_openai and settings.openrouter_api_key:
-        with httpx.Client(timeout=60) as client:
-            resp = client.post(
-                settings.openrouter_base_url,
-                headers={
-                    "Authorization": f"Bearer {settings.openrouter_api_key}",
-                    "Content-Type": "application/json",
-                },
-                json={
-                    "model": settings.openrouter_model,
-                    "messages": [
-                        {"role": "system", "content": "You are a concise startup research assistant."},
-                        {"role": "user", "content": prompt},
-                    ],
-                    "max_tokens": max_tokens,
-                },
-            )
-        resp.raise_for_status()
-        data = resp.json()
-        try:
-            return data["choices"][0]["message"]["content"]
-        except Exception as exc:  # pragma: no cover - defensive
-            raise RuntimeError(f"Unexpected LLM response format: {data}") from exc
-
-    # Fallback behaviour when no external LLM is configured
-    return prompt[:max_tokens]
+    key = _cache_key(prompt, max_tokens, use_cache)
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    text = _post_sync(_build_request(prompt, max_tokens), deadline)
+
+    if key:
+        llm_cache.put(key, get_settings().openrouter_model, text)
+    return text
+
+
+async def stream_text(prompt: str, *, max_tokens: int = 800, deadline: Optional[float] = None,
+                      use_cache: bool = True) -> AsyncIterator[str]:
+    """Stream a completion as it is generated (OpenAI-compatible ``stream: true``).
+
+    Yields content deltas in order. Connection errors and retryable
+    status codes are retried like :func:`generate_text` until the first
+    delta arrives; a stream that breaks after that raises
+    :class:`LLMUnavailableError`. Cached responses and the unconfigured
+    echo fallback are yielded as a single chunk.
+    """
+    if not is_llm_configured():
+        yield prompt[:max_tokens]
+        return
+
+    key = _cache_key(prompt, max_tokens, use_cache)
+    if key:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            yield cached
+            return
+
+    request = _build_request(prompt, max_tokens)
+    request["json"]["stream"] = True
+    state = _RetryState(deadline)
+    limiter = get_limiter(request["json"]["model"])
+    parts: List[str] = []
+
+    with state:
+        async with httpx.AsyncClient() as client:
+            while True:
+                async with limiter.async_slot() as waited:
+                    state.queued(waited)
+                    try:
+                        async with client.stream("POST", **request, timeout=state.attempt_timeout()) as resp:
+                            if resp.status_code in RETRYABLE_STATUS_CODES:
+                                delay = state.failed(_status_error(resp), _retry_after_seconds(resp))
+                            else:
+                                state.connected(resp)
+                                async for line in resp.aiter_lines():
+                                    chunk = _parse_stream_line(line)
+                                    if chunk:
+                                        parts.append(chunk)
+                                        yield chunk
+                                break
+                    except httpx.TransportError as exc:
+                        if parts:
+                            raise LLMUnavailableError(f"LLM stream interrupted: {exc}") from exc
+                        delay = state.failed(exc)
+                await asyncio.sleep(delay)
+
+    if key and parts:
+        await asyncio.to_thread(llm_cache.put, key, get_settings().openrouter_model, "".join(parts))
+
+
+def stream_text_sync(prompt: str, *, max_tokens: int = 800, deadline: Optional[float] = None,
+                     use_cache: bool = True) -> Iterator[str]:
+    """Blocking counterpart of :func:`stream_text` for synchronous callers."""
+    if not is_llm_configured():
+        yield prompt[:max_tokens]
+        return
+
+    key = _cache_key(prompt, max_tokens, use_cache)
+    if key:
+        cached = llm_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    request = _build_request(prompt, max_tokens)
+    request["json"]["stream"] = True
+    state = _RetryState(deadline)
+    limiter = get_limiter(request["json"]["model"])
+    parts: List[str] = []
+
+    with state:
+        with httpx.Client() as client:
+            while True:
+                with limiter.slot() as waited:
+                    state.queued(waited)
+                    try:
+                        with client.stream("POST", **request, timeout=state.attempt_timeout()) as resp:
+                            if resp.status_code in RETRYABLE_STATUS_CODES:
+                                delay = state.failed(_status_error(resp), _retry_after_seconds(resp))
+                            else:
+                                state.connected(resp)
+                                for line in resp.iter_lines():
+                                    chunk = _parse_stream_line(line)
+                                    if chunk:
+                                        parts.append(chunk)
+                                        yield chunk
+                                break
+                    except httpx.TransportError as exc:
+                        if parts:
+                            raise LLMUnavailableError(f"LLM stream interrupted: {exc}") from exc
+                        delay = state.failed(exc)
+                time.sleep(delay)
+
+    if key and parts:
+        llm_cache.put(key, get_settings().openrouter_model, "".join(parts))
+
+
+def get_llm_stats() -> Dict[str, Any]:
+    """Return circuit breaker state, cache counters and rate-limit queue waits."""
+    return {
+        "configured": is_llm_configured(),
+        "circuit_breaker": get_circuit_breaker().snapshot(),
+        "cache": llm_cache.stats(),
+        "rate_limits": limiter_stats(),
+    }
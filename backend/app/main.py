@@ -5,6 +5,9 @@ from fastapi.responses import FileResponse
 from .api import router
 from .db import init_db
 from .config import settings
+from .nlp_parser import nlp_status, warm_up
+from .assembler import start_render_pool, shutdown_render_pool
+from . import text_model, thread_budget, workers
 import os
 
 app = FastAPI(
@@ -43,11 +46,30 @@ async def startup_event():
     # Initialize database
     init_db()
     
+    # Load models in the background so the server accepts requests immediately;
+    # with a worker pool the models are loaded by the workers instead
+    if workers.is_enabled():
+        workers.start()
+    else:
+        # Jobs run in this process; give its torch/BLAS pools the configured budget
+        thread_budget.apply(workers=1)
+        warm_up()
+        if settings.generator_preload:
+            text_model.warm_up()
+    start_render_pool()
+    
     print(f"✓ Startify AI Backend started")
     print(f"✓ Output directory: {settings.output_dir}")
     print(f"✓ Database: {settings.database_url}")
     print(f"✓ CORS enabled for: {settings.frontend_url}")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the CPU worker and render pools."""
+    workers.shutdown()
+    shutdown_render_pool()
+
 # Mount static files for downloads
 if os.path.exists(settings.output_dir):
     app.mount("/files", StaticFiles(directory=settings.output_dir), name="files")
@@ -56,10 +78,17 @@ if os.path.exists(settings.output_dir):
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    nlp = nlp_status()
+    generator = text_model.model_status()
+    pool = workers.pool_status()
     return {
         "status": "ok",
         "service": "Startify AI Backend",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "ready": pool["ready"] if pool["enabled"] else nlp["ready"] and (generator["ready"] or not settings.generator_preload),
+        "nlp": nlp,
+        "generator": generator,
+        "workers": pool
     }
 
 
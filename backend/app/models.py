@@ -42,14 +42,27 @@ class Cache(Base):
     expires_at = Column(DateTime, nullable=True)
 
 
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    key = Column(String(64), unique=True, nullable=False, index=True)  # sha256 of model + prompts + params
+    model = Column(String(255), nullable=False)
+    response = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=func.now(), nullable=False)
+    last_accessed_at = Column(DateTime, default=func.now(), nullable=False, index=True)
+    expires_at = Column(DateTime, nullable=True)
+
+
 # Pydantic models for API request/response validation
 from pydantic import BaseModel
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
 
 class GenerateRequest(BaseModel):
     email: str
     idea: str
+    # Skip cached branding sections and generate new variations
+    fresh: bool = False
 
 
 class GenerateResponse(BaseModel):
@@ -57,6 +70,16 @@ class GenerateResponse(BaseModel):
     status: str
 
 
+class BatchGenerateRequest(BaseModel):
+    email: str
+    ideas: List[str]
+    fresh: bool = False
+
+
+class BatchGenerateResponse(BaseModel):
+    jobs: List[GenerateResponse]
+
+
 class JobStatus(BaseModel):
     job_id: str
     status: str  # pending, processing, completed, failed
@@ -65,3 +88,12 @@ class JobStatus(BaseModel):
 
 class DownloadResponse(BaseModel):
     url: str
+
+
+class RegenerateResponse(BaseModel):
+    job_id: str
+    section: str
+    content: Any
+    # Re-rendered artifacts (empty when the job has none rendered yet)
+    artifacts: Dict[str, Any] = {}
+    seconds: float
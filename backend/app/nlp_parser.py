@@ -1,27 +1,113 @@
-"""NLP parsing utilities for idea extraction using spaCy with regex fallback."""
+"""NLP parsing utilities for idea extraction using spaCy with a rule-based fallback.
+
+The spaCy model is loaded lazily: either on the first parse or by
+:func:`warm_up`, which the app calls in a background thread at startup
+so the HTTP server is ready before the model finishes loading.
+"""
+import copy
+import hashlib
+import importlib.metadata
 import re
-from typing import Dict, List, Any
+import subprocess
 import sys
+import threading
+import unicodedata
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Tuple
 
-# Try to load spaCy
-try:
-    import spacy
-    try:
-        nlp = spacy.load("en_core_web_sm")
-        SPACY_AVAILABLE = True
-        print("✓ spaCy loaded successfully")
-    except OSError:
-        print("⚠ spaCy model not found, downloading...")
-        import subprocess
-        subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"], check=True)
-        nlp = spacy.load("en_core_web_sm")
-        SPACY_AVAILABLE = True
-        print("✓ spaCy model downloaded and loaded")
-except Exception as e:
-    print(f"⚠ spaCy not available: {e}")
-    print("→ Falling back to regex-based parsing")
-    SPACY_AVAILABLE = False
-    nlp = None
+from .config import get_settings
+from .utils import LRUCache, get_cached, set_cache
+
+# Bump when parsing rules change; memoized results from older versions are ignored
+PARSER_VERSION = "2"
+
+# Model state: not_loaded -> loading -> ready | unavailable
+_nlp = None
+_nlp_state = "not_loaded"
+_nlp_error: Optional[str] = None
+_nlp_lock = threading.Lock()
+
+# Memo of parse results keyed by normalized text (see _memo_key)
+_memo: Optional[LRUCache] = None
+_persisted_hits = 0
+
+
+def get_nlp():
+    """Return the spaCy pipeline, loading it on first use.
+    
+    Returns None if spaCy or the model is not available, in which case
+    parsing falls back to the rule parser. Concurrent callers wait for a
+    single load.
+    """
+    global _nlp, _nlp_state, _nlp_error
+    if _nlp_state in ("ready", "unavailable"):
+        return _nlp
+    
+    with _nlp_lock:
+        if _nlp_state in ("ready", "unavailable"):
+            return _nlp
+        
+        _nlp_state = "loading"
+        settings = get_settings()
+        try:
+            import spacy
+            try:
+                _nlp = spacy.load(settings.spacy_model, exclude=settings.spacy_exclude)
+            except OSError:
+                if not settings.spacy_auto_download:
+                    raise
+                print(f"⚠ spaCy model not found, downloading {settings.spacy_model}...")
+                subprocess.run([sys.executable, "-m", "spacy", "download", settings.spacy_model], check=True)
+                _nlp = spacy.load(settings.spacy_model, exclude=settings.spacy_exclude)
+            _nlp_state = "ready"
+            print(f"✓ spaCy loaded successfully (pipeline: {', '.join(_nlp.pipe_names)})")
+        except Exception as e:
+            print(f"⚠ spaCy not available: {e}")
+            print("→ Falling back to rule-based parsing")
+            _nlp = None
+            _nlp_error = str(e)
+            _nlp_state = "unavailable"
+    
+    return _nlp
+
+
+def _active_nlp():
+    """The spaCy pipeline to parse with, or None to use the rule parser."""
+    if get_settings().nlp_mode == "rules":
+        return None
+    return get_nlp()
+
+
+def warm_up(background: bool = True) -> Optional[threading.Thread]:
+    """Load the spaCy model ahead of the first request.
+    
+    Args:
+        background: Load in a daemon thread and return it instead of blocking
+    """
+    if get_settings().nlp_mode == "rules":
+        return None
+    if not background:
+        get_nlp()
+        return None
+    thread = threading.Thread(target=get_nlp, name="spacy-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def nlp_status() -> Dict[str, Any]:
+    """Readiness of the NLP parser, for health checks."""
+    settings = get_settings()
+    if settings.nlp_mode == "rules":
+        return {"mode": "rules", "model": None, "state": "ready", "pipeline": [], "ready": True, "error": None}
+    return {
+        "mode": settings.nlp_mode,
+        "model": settings.spacy_model,
+        "state": _nlp_state,
+        "pipeline": list(_nlp.pipe_names) if _nlp is not None else [],
+        # Parsing never blocks once loading has finished, even if spaCy is unavailable
+        "ready": _nlp_state in ("ready", "unavailable"),
+        "error": _nlp_error,
+    }
 
 
 def parse_idea(idea_text: str) -> Dict[str, Any]:
@@ -38,6 +124,10 @@ def parse_idea(idea_text: str) -> Dict[str, Any]:
         - entities: Named entities found
         - raw: Original text
         
+    Results are memoized by normalized text (unicode and whitespace). The
+    normalized text is what gets parsed; entity offsets are mapped back
+    so they always index into ``raw``.
+        
     Example:
         >>> parse_idea("smart grocery app for rural areas with delivery and digital payments")
         {
@@ -48,143 +138,393 @@ def parse_idea(idea_text: str) -> Dict[str, Any]:
             "raw": "smart grocery app for rural areas with delivery and digital payments"
         }
     """
-    if SPACY_AVAILABLE and nlp:
-        # Use spaCy for advanced NLP parsing
-        doc = nlp(idea_text)
-        
-        # Extract industry - look for nouns that indicate domain/industry
-        industry = "general"
-        industry_keywords = ["app", "platform", "service", "system", "tool", "software"]
+    normalized = normalize_idea_text(idea_text)
+    key = _memo_key(normalized)
+    
+    result = _memo_get(key)
+    if result is None:
+        nlp = _active_nlp()
+        if nlp is not None:
+            # Use spaCy for advanced NLP parsing
+            result = _parse_doc(nlp(normalized))
+        else:
+            result = _parse_with_rules(normalized)
+            # spaCy may have just failed to load; file the result under the rule parser
+            key = _memo_key(normalized, "rules")
+        _memo_put(key, result)
+    
+    return _with_raw(result, idea_text)
+
+
+def parse_ideas(texts: List[str], batch_size: Optional[int] = None,
+                n_process: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Parse many ideas at once, streaming them through ``nlp.pipe``.
+    
+    Memoized ideas are served from the cache; only the remaining distinct
+    texts are parsed.
+    
+    Args:
+        texts: Raw idea texts
+        batch_size: Documents per spaCy batch (defaults to settings.spacy_batch_size)
+        n_process: Worker processes for spaCy (defaults to settings.spacy_n_process)
         
-        # First try to find industry from noun compounds
-        for token in doc:
-            if token.pos_ == "NOUN" and token.text.lower() not in industry_keywords:
-                # Check if it's part of a compound (e.g., "fitness app")
-                if any(child.text.lower() in industry_keywords for child in token.children):
-                    industry = token.text.lower()
-                    break
-                # Check if the noun is before an app-related word
-                if token.i < len(doc) - 1 and doc[token.i + 1].text.lower() in industry_keywords:
-                    industry = token.text.lower()
-                    break
+    Returns:
+        One parsed structure per text, in the same order, as returned by
+        :func:`parse_idea`
+    """
+    normalized = [normalize_idea_text(text) for text in texts]
+    keys = [_memo_key(text) for text in normalized]
+    
+    results: Dict[str, Dict[str, Any]] = {}
+    for key in keys:
+        if key not in results:
+            cached = _memo_get(key)
+            if cached is not None:
+                results[key] = cached
+    
+    pending = list(dict.fromkeys(
+        (key, text) for key, text in zip(keys, normalized) if key not in results
+    ))
+    if pending:
+        nlp = _active_nlp()
+        pending_texts = [text for _, text in pending]
+        if nlp is None:
+            parsed = [_parse_with_rules(text) for text in pending_texts]
+        else:
+            settings = get_settings()
+            docs = nlp.pipe(
+                pending_texts,
+                batch_size=batch_size or settings.spacy_batch_size,
+                n_process=n_process or settings.spacy_n_process,
+            )
+            parsed = [_parse_doc(doc) for doc in docs]
         
-        # Extract target audience - look for prepositional phrases with "for"
-        target_audience = "general public"
-        for token in doc:
-            if token.text.lower() == "for" and token.pos_ == "ADP":
-                # Get the noun phrase following "for"
-                audience_tokens = []
-                head = token.head
-                for child in head.children:
-                    if child.i > token.i and child.pos_ in ["NOUN", "ADJ", "PROPN"]:
-                        audience_tokens.append(child.text)
-                if audience_tokens:
-                    target_audience = " ".join(audience_tokens)
+        for (key, text), result in zip(pending, parsed):
+            _memo_put(key if nlp is not None else _memo_key(text, "rules"), result)
+            results[key] = result
+    
+    return [_with_raw(results[key], text) for key, text in zip(keys, texts)]
+
+
+def normalize_idea_text(idea_text: str) -> str:
+    """Normalize unicode and whitespace so trivially different texts share a memo entry."""
+    return re.sub(r'\s+', ' ', unicodedata.normalize("NFKC", idea_text)).strip()
+
+
+def _memo_key(normalized: str, backend: Optional[str] = None) -> str:
+    """Memo key: parser version, parser backend and a hash of the normalized text."""
+    digest = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+    return f"parse_idea:{PARSER_VERSION}:{backend or _parser_backend()}:{digest}"
+
+
+def _parser_backend() -> str:
+    """Identity of the parser that would be used, from settings alone.
+    
+    Never loads spaCy, so memo hits skip the model load entirely; the
+    installed model package version is read from its metadata.
+    """
+    settings = get_settings()
+    if settings.nlp_mode == "rules" or _nlp_state == "unavailable":
+        return "rules"
+    version = _package_version(settings.spacy_model)
+    if version is None and not settings.spacy_auto_download:
+        # The model is not installed, so loading it would fail
+        return "rules"
+    return f"spacy-{settings.spacy_model}-{version}"
+
+
+@lru_cache()
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _get_memo() -> LRUCache:
+    global _memo
+    if _memo is None:
+        with _nlp_lock:
+            if _memo is None:
+                _memo = LRUCache(get_settings().parse_memo_size)
+    return _memo
+
+
+def _memo_get(key: str) -> Optional[Dict[str, Any]]:
+    global _persisted_hits
+    memo = _get_memo()
+    result = memo.get(key)
+    if result is not None or not get_settings().parse_memo_persist:
+        return result
+    
+    try:
+        result = get_cached(key)
+    except Exception as e:
+        print(f"Parse memo read error: {e}")
+        return None
+    if result is not None:
+        _persisted_hits += 1
+        memo.put(key, result)
+    return result
+
+
+def _memo_put(key: str, result: Dict[str, Any]) -> None:
+    settings = get_settings()
+    # Memo entries never carry the caller's raw text
+    result = {k: v for k, v in result.items() if k != "raw"}
+    _get_memo().put(key, result)
+    if settings.parse_memo_persist:
+        try:
+            set_cache(key, result, ttl_seconds=settings.parse_memo_ttl_seconds)
+        except Exception as e:
+            print(f"Parse memo write error: {e}")
+
+
+def _with_raw(result: Dict[str, Any], idea_text: str) -> Dict[str, Any]:
+    """Copy a (possibly shared) memoized result and attach the caller's raw text.
+    
+    Entity offsets in memoized results index into the normalized text;
+    they are mapped onto ``idea_text`` here.
+    """
+    parsed = copy.deepcopy(result)
+    parsed["raw"] = idea_text
+    positions = _normalized_positions(idea_text)
+    cursor = 0
+    for entity in parsed.get("entities", []):
+        start, end = entity.get("start"), entity.get("end")
+        if positions is not None and start is not None and end is not None and 0 <= start < end <= len(positions):
+            entity["start"], entity["end"] = positions[start][0], positions[end - 1][1]
+            continue
+        # Normalization could not be aligned with the raw text; find the entity instead
+        found = idea_text.find(entity.get("text", ""), cursor)
+        if found == -1 or not entity.get("text"):
+            entity["start"] = entity["end"] = None
+        else:
+            entity["start"], entity["end"] = found, found + len(entity["text"])
+            cursor = entity["end"]
+    return parsed
+
+
+def _normalized_positions(idea_text: str) -> Optional[List[Tuple[int, int]]]:
+    """Span in ``idea_text`` of each character of its normalized form.
+    
+    Mirrors :func:`normalize_idea_text` one base character (with its
+    combining marks) at a time. Returns None when that does not
+    reproduce the normalized text exactly.
+    """
+    clusters: List[List[int]] = []
+    for index, char in enumerate(idea_text):
+        if clusters and unicodedata.combining(char):
+            clusters[-1].append(index)
+        else:
+            clusters.append([index])
+    
+    chars: List[str] = []
+    positions: List[Tuple[int, int]] = []
+    space_at: Optional[int] = None
+    for cluster in clusters:
+        piece = unicodedata.normalize("NFKC", "".join(idea_text[i] for i in cluster))
+        for char in piece:
+            if re.match(r'\s', char):
+                if space_at is None:
+                    space_at = cluster[0]
+                continue
+            if space_at is not None and chars:
+                chars.append(" ")
+                positions.append((space_at, space_at + 1))
+            space_at = None
+            chars.append(char)
+            positions.append((cluster[0], cluster[-1] + 1))
+    if "".join(chars) != normalize_idea_text(idea_text):
+        return None
+    return positions
+
+
+def parse_memo_stats() -> Dict[str, Any]:
+    """Hit-rate metrics for the parse memo (in-memory and persisted)."""
+    stats = _get_memo().stats()
+    stats["persisted_hits"] = _persisted_hits
+    stats["parser_version"] = PARSER_VERSION
+    return stats
+
+
+def _parse_doc(doc) -> Dict[str, Any]:
+    """Extract the idea structure from a spaCy ``Doc``."""
+    idea_text = doc.text
+    
+    # Extract industry - look for nouns that indicate domain/industry
+    industry = "general"
+    industry_keywords = ["app", "platform", "service", "system", "tool", "software"]
+    
+    # First try to find industry from noun compounds
+    for token in doc:
+        if token.pos_ == "NOUN" and token.text.lower() not in industry_keywords:
+            # Check if it's part of a compound (e.g., "fitness app")
+            if any(child.text.lower() in industry_keywords for child in token.children):
+                industry = token.text.lower()
+                break
+            # Check if the noun is before an app-related word
+            if token.i < len(doc) - 1 and doc[token.i + 1].text.lower() in industry_keywords:
+                industry = token.text.lower()
+                break
+    
+    # Extract target audience - look for prepositional phrases with "for"
+    target_audience = "general public"
+    for token in doc:
+        if token.text.lower() == "for" and token.pos_ == "ADP":
+            # Get the noun phrase following "for"
+            audience_tokens = []
+            head = token.head
+            for child in head.children:
+                if child.i > token.i and child.pos_ in ["NOUN", "ADJ", "PROPN"]:
+                    audience_tokens.append(child.text)
+            if audience_tokens:
+                target_audience = " ".join(audience_tokens)
+                break
+    
+    # Also check noun chunks for more complete audience description
+    if target_audience == "general public":
+        for chunk in doc.noun_chunks:
+            chunk_text = chunk.text.lower()
+            if any(prep in idea_text.lower()[:chunk.start_char] for prep in ["for "]):
+                if chunk.start_char > idea_text.lower().find("for "):
+                    target_audience = chunk.text
                     break
+    
+    # Extract features - look for objects and complements after "with", "including"
+    features = []
+    feature_indicators = ["with", "including", "featuring", "offers", "provides"]
+    
+    for token in doc:
+        if token.text.lower() in feature_indicators:
+            # Get noun phrases after the indicator
+            for child in token.children:
+                if child.pos_ in ["NOUN", "PROPN"]:
+                    feature_tokens = [child.text]
+                    # Get compound nouns
+                    for subchild in child.children:
+                        if subchild.dep_ in ["compound", "amod"]:
+                            feature_tokens.insert(0, subchild.text)
+                    feature = " ".join(feature_tokens)
+                    if feature and feature not in features:
+                        features.append(feature)
+    
+    # Extract named entities
+    entities = [
+        {
+            "text": ent.text,
+            "label": ent.label_,
+            "start": ent.start_char,
+            "end": ent.end_char
+        }
+        for ent in doc.ents
+    ]
+    
+    print(f"✓ spaCy parsing complete: industry={industry}, audience={target_audience}, features={len(features)}")
+    
+    return {
+        "industry": industry,
+        "target_audience": target_audience,
+        "features": features,
+        "entities": entities,
+        "raw": idea_text
+    }
+
+
+# Precompiled tables for the single-pass rule parser
+_RULE_TOKEN = re.compile(r"[^\W_][\w'-]*|[^\w\s]")
+PRODUCT_WORDS = frozenset(["app", "platform", "service", "system", "tool", "software"])
+FEATURE_MARKERS = frozenset(["with", "including", "featuring", "offers", "provides", "offering", "providing"])
+AUDIENCE_TERMINATORS = frozenset(["with", "and", "including"])
+# Punctuation that ends a clause; commas only separate features
+CLAUSE_END = frozenset(".;:!?()")
+INDUSTRY_SKIP_WORDS = frozenset([
+    "app", "platform", "service", "system", "tool", "software", "a", "an", "the",
+    "for", "with", "and", "smart", "ai", "new", "mobile", "online", "simple", "my"
+])
+
+
+def _parse_with_rules(idea_text: str) -> Dict[str, Any]:
+    """Extract the idea structure with precompiled rules in a single pass.
+    
+    Used when spaCy is unavailable or ``settings.nlp_mode`` is "rules".
+    Tokens are scanned once, left to right:
+    - industry: the word before a product word ("fitness app"), else the
+      word after "<product> for", else the first meaningful word
+    - target_audience: words after the first "for" up to with/and/including
+    - features: phrases after with/including/offers/..., split on "and" and commas
+    - entities: capitalized words, with their exact character offsets
+    """
+    industry = None
+    industry_after_for = None
+    first_meaningful = None
+    audience: List[str] = []
+    audience_state = "pending"  # pending -> collecting -> done
+    features: List[str] = []
+    current_feature: List[str] = []
+    in_features = False
+    entities = []
+    prev = None
+    prev_prev = None
+    
+    def flush_feature():
+        feature = " ".join(current_feature)
+        if len(feature) > 2 and feature not in features:
+            features.append(feature)
+        current_feature.clear()
+    
+    for match in _RULE_TOKEN.finditer(idea_text):
+        token = match.group()
         
-        # Also check noun chunks for more complete audience description
-        if target_audience == "general public":
-            for chunk in doc.noun_chunks:
-                chunk_text = chunk.text.lower()
-                if any(prep in idea_text.lower()[:chunk.start_char] for prep in ["for "]):
-                    if chunk.start_char > idea_text.lower().find("for "):
-                        target_audience = chunk.text
-                        break
-        
-        # Extract features - look for objects and complements after "with", "including"
-        features = []
-        feature_indicators = ["with", "including", "featuring", "offers", "provides"]
-        
-        for token in doc:
-            if token.text.lower() in feature_indicators:
-                # Get noun phrases after the indicator
-                for child in token.children:
-                    if child.pos_ in ["NOUN", "PROPN"]:
-                        feature_tokens = [child.text]
-                        # Get compound nouns
-                        for subchild in child.children:
-                            if subchild.dep_ in ["compound", "amod"]:
-                                feature_tokens.insert(0, subchild.text)
-                        feature = " ".join(feature_tokens)
-                        if feature and feature not in features:
-                            features.append(feature)
-        
-        # Extract named entities
-        entities = [
-            {
-                "text": ent.text,
-                "label": ent.label_,
-                "start": ent.start_char,
-                "end": ent.end_char
-            }
-            for ent in doc.ents
-        ]
-        
-        print(f"✓ spaCy parsing complete: industry={industry}, audience={target_audience}, features={len(features)}")
-        
-    else:
-        # Fallback to regex-based parsing
-        print("→ Using regex-based parsing (spaCy unavailable)")
-        text_lower = idea_text.lower()
-        words = idea_text.split()
-        
-        # Extract industry - look for domain keywords
-        industry = "general"
-        industry_patterns = [
-            r'(\w+)\s+(?:app|platform|service|system|tool|software)',
-            r'(?:app|platform|service)\s+for\s+(\w+)',
-        ]
-        
-        for pattern in industry_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                industry = match.group(1)
-                break
+        if not token[0].isalnum():
+            if audience_state == "collecting":
+                audience_state = "done"
+            if in_features:
+                flush_feature()
+                in_features = token not in CLAUSE_END
+            prev = prev_prev = None
+            continue
         
-        # If no pattern matched, extract first meaningful noun
-        if industry == "general":
-            skip_words = {"app", "platform", "service", "system", "tool", "software", "a", "an", "the", "for", "with", "and", "smart", "ai"}
-            for word in text_lower.split():
-                clean_word = re.sub(r'[^a-z]', '', word)
-                if clean_word not in skip_words and len(clean_word) > 3:
-                    industry = clean_word
-                    break
+        lower = token.lower()
+        if token[0].isupper() and len(token) > 1:
+            entities.append({
+                "text": token,
+                "label": "ENTITY",
+                "start": match.start(),
+                "end": match.end()
+            })
         
-        # Extract target audience - look for "for X" pattern
-        target_audience = "general public"
-        for_match = re.search(r'for\s+([\w\s]+?)(?:\s+with|\s+and|\s+including|$)', text_lower)
-        if for_match:
-            target_audience = for_match.group(1).strip()
+        if industry is None and lower in PRODUCT_WORDS and prev and prev not in INDUSTRY_SKIP_WORDS:
+            industry = prev
+        if industry_after_for is None and prev == "for" and prev_prev in PRODUCT_WORDS:
+            industry_after_for = lower
+        if first_meaningful is None and lower.isalpha() and len(lower) > 3 and lower not in INDUSTRY_SKIP_WORDS:
+            first_meaningful = lower
         
-        # Extract features - look for "with X", "and X", "including X" patterns
-        features = []
-        feature_patterns = [
-            r'with\s+([\w\s]+?)(?:\s+and|\s+including|$)',
-            r'including\s+([\w\s]+?)(?:\s+and|\s+with|$)',
-            r'and\s+([\w\s]+?)(?:\s+with|\s+including|$)',
-        ]
+        if audience_state == "collecting":
+            if lower in AUDIENCE_TERMINATORS:
+                audience_state = "done"
+            else:
+                audience.append(lower)
+        elif audience_state == "pending" and lower == "for" and not in_features:
+            audience_state = "collecting"
         
-        for pattern in feature_patterns:
-            matches = re.finditer(pattern, text_lower)
-            for match in matches:
-                feature = match.group(1).strip()
-                if feature and len(feature) > 2 and feature not in features:
-                    features.append(feature)
+        if lower in FEATURE_MARKERS:
+            flush_feature()
+            in_features = True
+        elif in_features:
+            if lower == "and":
+                flush_feature()
+            else:
+                current_feature.append(lower)
         
-        # Extract simple entities (capitalized words)
-        entities = []
-        for i, word in enumerate(words):
-            if word[0].isupper() and len(word) > 1:
-                entities.append({
-                    "text": word,
-                    "label": "ENTITY",
-                    "start": idea_text.find(word),
-                    "end": idea_text.find(word) + len(word)
-                })
+        prev_prev, prev = prev, lower
+    
+    flush_feature()
     
     return {
-        "industry": industry,
-        "target_audience": target_audience,
+        "industry": industry or industry_after_for or first_meaningful or "general",
+        "target_audience": " ".join(audience) or "general public",
         "features": features,
         "entities": entities,
         "raw": idea_text
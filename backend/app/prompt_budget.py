@@ -0,0 +1,132 @@
+"""Token-aware prompt budgeting for LLM calls.
+
+Scraped research text is split into passages, near-duplicate passages
+are dropped, the rest are ranked by relevance to the idea, and the best
+ones are packed into a fixed token budget. Tokens are counted with the
+GPT-2 tokenizer when transformers is installed and the tokenizer is
+already in the local Hugging Face cache, or estimated otherwise; this
+runs in the API process, so it never downloads anything.
+"""
+import re
+from functools import lru_cache
+from typing import Iterable, List, Optional
+
+from .summarizer import score_sentences, split_sentences
+
+
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+_SHINGLE_WORDS = 3
+# Passages longer than this are split into sentence groups before ranking
+MAX_PASSAGE_TOKENS = 120
+
+
+@lru_cache(maxsize=1)
+def _get_tokenizer():
+    try:
+        from transformers import GPT2TokenizerFast
+        # Never block a request on a download; the estimate is close enough
+        return GPT2TokenizerFast.from_pretrained("gpt2", local_files_only=True)
+    except Exception as e:
+        print(f"Tokenizer not available, estimating token counts: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens in ``text`` with the local tokenizer (or an estimate)."""
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text))
+    # BPE splits long words into several tokens
+    return sum(1 + len(piece) // 8 for piece in _PIECE_PATTERN.findall(text))
+
+
+def split_passages(text: str, max_tokens: int = MAX_PASSAGE_TOKENS) -> List[str]:
+    """Split text on blank lines, breaking long paragraphs into sentence groups."""
+    passages = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = re.sub(r'\s+', ' ', paragraph).strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) <= max_tokens:
+            passages.append(paragraph)
+            continue
+
+        group: List[str] = []
+        group_tokens = 0
+        for sentence in split_sentences(paragraph) or [paragraph]:
+            tokens = count_tokens(sentence)
+            if group and group_tokens + tokens > max_tokens:
+                passages.append(" ".join(group))
+                group, group_tokens = [], 0
+            group.append(sentence)
+            group_tokens += tokens
+        if group:
+            passages.append(" ".join(group))
+    return passages
+
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < _SHINGLE_WORDS:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + _SHINGLE_WORDS]) for i in range(len(words) - _SHINGLE_WORDS + 1)}
+
+
+def dedupe_passages(passages: List[str], threshold: float = 0.7) -> List[str]:
+    """Drop passages whose word-shingle Jaccard similarity to an earlier one exceeds ``threshold``."""
+    kept: List[str] = []
+    kept_shingles: List[set] = []
+    for passage in passages:
+        shingles = _shingles(passage)
+        duplicate = any(
+            len(shingles & other) / len(shingles | other) > threshold
+            for other in kept_shingles
+            if shingles | other
+        )
+        if not duplicate:
+            kept.append(passage)
+            kept_shingles.append(shingles)
+    return kept
+
+
+def pack_passages(passages: List[str], query: Optional[str], token_budget: int) -> str:
+    """Pack the most relevant passages into ``token_budget`` tokens.
+
+    Passages are chosen greedily by score and emitted in their original
+    order so the context still reads naturally.
+    """
+    if not passages:
+        return ""
+
+    scores = score_sentences(passages, query)
+    costs = [count_tokens(passage) for passage in passages]
+    chosen = []
+    used = 0
+    for index in sorted(range(len(passages)), key=lambda i: -scores[i]):
+        if used + costs[index] <= token_budget:
+            chosen.append(index)
+            used += costs[index]
+
+    if not chosen:
+        # Even the best passage is too long; keep as many of its sentences as fit
+        best = passages[int(scores.argmax())]
+        kept = []
+        for sentence in split_sentences(best) or [best]:
+            used += count_tokens(sentence)
+            if used > token_budget:
+                break
+            kept.append(sentence)
+        return " ".join(kept)
+
+    return "\n\n".join(passages[i] for i in sorted(chosen))
+
+
+def build_context(texts: Iterable[str], query: Optional[str], token_budget: int) -> str:
+    """Split, deduplicate, rank and pack research texts into a token budget."""
+    passages = []
+    for text in texts:
+        if text:
+            passages.extend(split_passages(text))
+    return pack_passages(dedupe_passages(passages), query, token_budget)
@@ -0,0 +1,290 @@
+"""Client-side rate limiting and concurrency caps for LLM requests.
+
+Each model gets a token bucket (requests per minute with a burst
+allowance) and a cap on in-flight requests, shared by every thread and
+the asyncio event loop of the process. Callers that exceed the limits
+are queued rather than rejected, threads and coroutines in one FIFO
+queue, and the time they spend waiting is
+recorded so quotas can be sized from real numbers.
+"""
+import asyncio
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict
+
+from .config import get_settings
+
+
+# Number of recent queue waits kept for percentile reporting
+WAIT_SAMPLE_SIZE = 500
+
+
+class TokenBucket:
+    """Thread-safe token bucket handing out reservations in FIFO order."""
+
+    def __init__(self, rate_per_second: float, capacity: float):
+        self.rate = rate_per_second
+        self.capacity = max(1.0, capacity)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it.
+
+        The balance may go negative, so later callers wait behind earlier
+        ones instead of racing for the next refill.
+        """
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def refund(self) -> None:
+        """Return a reservation that was never used (its waiter was cancelled)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1.0)
+
+
+class _Waiter:
+    """A thread or coroutine queued on a :class:`FifoSemaphore`."""
+
+    __slots__ = ("event", "future", "loop", "granted", "abandoned")
+
+    def __init__(self, event=None, future=None, loop=None):
+        self.event = event
+        self.future = future
+        self.loop = loop
+        self.granted = False
+        self.abandoned = False
+
+
+def _resolve(future: "asyncio.Future") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class FifoSemaphore:
+    """Concurrency cap shared by threads and coroutines, served in arrival order.
+
+    Threads block on an event and coroutines await a future, but both wait
+    in the same queue; a released slot is handed directly to the oldest
+    waiter, so nobody can overtake it.
+    """
+
+    def __init__(self, value: int):
+        self._lock = threading.Lock()
+        self._free = value
+        self._waiters: deque = deque()
+
+    @property
+    def waiting(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+    def _admit(self, waiter: _Waiter) -> bool:
+        """Take a free slot if nobody is queued, otherwise join the queue."""
+        with self._lock:
+            if self._free > 0 and not self._waiters:
+                self._free -= 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Leave the queue; a slot handed over in the meantime is passed on."""
+        with self._lock:
+            if not waiter.granted:
+                waiter.abandoned = True
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+                return
+        self.release()
+
+    def acquire(self) -> None:
+        waiter = _Waiter(event=threading.Event())
+        if self._admit(waiter):
+            return
+        try:
+            waiter.event.wait()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    async def acquire_async(self) -> None:
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(future=loop.create_future(), loop=loop)
+        if self._admit(waiter):
+            return
+        try:
+            await waiter.future
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if not waiter.abandoned:
+                    waiter.granted = True
+                    break
+            else:
+                self._free += 1
+                return
+        if waiter.event is not None:
+            waiter.event.set()
+            return
+        try:
+            waiter.loop.call_soon_threadsafe(_resolve, waiter.future)
+        except RuntimeError:
+            # Its event loop is gone and will never take the slot
+            self.release()
+
+
+class ModelLimiter:
+    """Rate limit plus concurrency cap for one model."""
+
+    def __init__(self, model: str, requests_per_minute: float, burst: float, max_concurrency: int):
+        self.model = model
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._bucket = TokenBucket(requests_per_minute / 60.0, burst)
+        self._semaphore = FifoSemaphore(self.max_concurrency)
+        self._stats_lock = threading.Lock()
+        self._waits = deque(maxlen=WAIT_SAMPLE_SIZE)
+        self._requests = 0
+        self._queued = 0
+        self._in_flight = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _enter_queue(self) -> float:
+        with self._stats_lock:
+            self._queued += 1
+        return time.monotonic()
+
+    def _leave_queue(self, started: float) -> float:
+        waited = time.monotonic() - started
+        with self._stats_lock:
+            self._queued -= 1
+            self._in_flight += 1
+            self._requests += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+            self._waits.append(waited)
+        return waited
+
+    def _release(self) -> None:
+        with self._stats_lock:
+            self._in_flight -= 1
+        self._semaphore.release()
+
+    def _abandon_queue(self, acquired: bool, reserved: bool) -> None:
+        """Undo a queued caller's progress when it is cancelled while waiting."""
+        if reserved:
+            self._bucket.refund()
+        if acquired:
+            self._semaphore.release()
+        with self._stats_lock:
+            self._queued -= 1
+
+    @contextmanager
+    def slot(self):
+        """Block until a request may be sent; yields the seconds spent queued."""
+        started = self._enter_queue()
+        acquired = reserved = False
+        try:
+            self._semaphore.acquire()
+            acquired = True
+            delay = self._bucket.reserve()
+            reserved = True
+            time.sleep(delay)
+        except BaseException:
+            self._abandon_queue(acquired, reserved)
+            raise
+        waited = self._leave_queue(started)
+        try:
+            yield waited
+        finally:
+            self._release()
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """Async variant of :meth:`slot` that never blocks the event loop.
+
+        Async and sync callers share one FIFO queue for the concurrency cap.
+        """
+        started = self._enter_queue()
+        acquired = reserved = False
+        try:
+            await self._semaphore.acquire_async()
+            acquired = True
+            delay = self._bucket.reserve()
+            reserved = True
+            await asyncio.sleep(delay)
+        except BaseException:
+            self._abandon_queue(acquired, reserved)
+            raise
+        waited = self._leave_queue(started)
+        try:
+            yield waited
+        finally:
+            self._release()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            waits = sorted(self._waits)
+            requests = self._requests
+            snapshot = {
+                "requests_per_minute": self.requests_per_minute,
+                "max_concurrency": self.max_concurrency,
+                "requests": requests,
+                "queued": self._queued,
+                "in_flight": self._in_flight,
+                "avg_wait_seconds": round(self._total_wait / requests, 3) if requests else 0.0,
+                "max_wait_seconds": round(self._max_wait, 3),
+            }
+        for label, fraction in (("p50_wait_seconds", 0.5), ("p95_wait_seconds", 0.95)):
+            snapshot[label] = round(waits[min(len(waits) - 1, int(len(waits) * fraction))], 3) if waits else 0.0
+        return snapshot
+
+
+_limiters: Dict[str, ModelLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(model: str) -> ModelLimiter:
+    """Return the shared limiter for ``model``, applying per-model overrides."""
+    with _limiters_lock:
+        limiter = _limiters.get(model)
+        if limiter is None:
+            settings = get_settings()
+            overrides = settings.llm_model_limits.get(model, {})
+            limiter = ModelLimiter(
+                model,
+                requests_per_minute=overrides.get("requests_per_minute", settings.llm_requests_per_minute),
+                burst=overrides.get("burst", settings.llm_burst),
+                max_concurrency=overrides.get("max_concurrency", settings.llm_max_concurrency),
+            )
+            _limiters[model] = limiter
+        return limiter
+
+
+def limiter_stats() -> Dict[str, Any]:
+    """Return queue and wait statistics for every model used so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.model: limiter.snapshot() for limiter in limiters}
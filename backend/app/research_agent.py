@@ -6,14 +6,17 @@ keeping the lightweight scraping and trend collection logic local.
 """
 import requests
 from bs4 import BeautifulSoup
-from typing import Dict, List, Any
+from typing import Any, Callable, Dict, List, Optional
 import hashlib
 import json
 from datetime import datetime, timedelta
 
 from .db import SessionLocal
 from .models import Cache
-from .llm_client import generate_text_sync
+from .config import get_settings
+from .llm_client import generate_text_sync, is_llm_configured, stream_text_sync
+from .prompt_budget import build_context
+from .summarizer import extractive_summary
 
 # Optional: Google Trends
 try:
@@ -23,11 +26,15 @@ except ImportError:
     PYTRENDS_AVAILABLE = False
 
 
-def run_research(idea_struct: dict) -> dict:
+def run_research(idea_struct: dict, on_delta: Optional[Callable[[str], None]] = None,
+                 on_reset: Optional[Callable[[], None]] = None) -> dict:
     """Run comprehensive research on an idea.
     
     Args:
         idea_struct: Parsed idea structure containing industry, target_audience, features, etc.
+        on_delta: Optional callback receiving the LLM summary incrementally as it streams
+        on_reset: Optional callback invoked when a stream fails partway and the
+            chunks already passed to ``on_delta`` are replaced by the fallback summary
         
     Returns:
         Dictionary containing:
@@ -59,7 +66,7 @@ def run_research(idea_struct: dict) -> dict:
     trends = _get_trends(idea_struct)
     
     # Step 4: Summarize scraped text using the configured LLM
-    summary_text = _summarize_content(scraped_data, idea_struct)
+    summary_text = _summarize_content(scraped_data, idea_struct, on_delta, on_reset)
     
     # Step 5: Extract competitors, opportunities, and risks
     competitors = _extract_competitors(scraped_data)
@@ -126,13 +133,13 @@ def _scrape_web(query: str) -> List[Dict[str, str]]:
                 soup = BeautifulSoup(response.content, "html.parser")
                 
                 # Extract text from paragraphs
-                paragraphs = soup.find_all("p", limit=5)
-                text = " ".join([p.get_text().strip() for p in paragraphs])
+                paragraphs = soup.find_all("p", limit=8)
+                text = "\n\n".join([p.get_text().strip() for p in paragraphs])
                 
                 results.append({
                     "url": url,
                     "title": soup.title.string if soup.title else "No title",
-                    "text": text[:1000]  # Limit text length
+                    "text": text[:4000]  # Limit text length; prompts are token-budgeted later
                 })
         except Exception as e:
             print(f"Error scraping {url}: {e}")
@@ -166,21 +173,35 @@ def _get_trends(idea_struct: dict) -> Dict[str, float]:
     }
 
 
-def _summarize_content(scraped_data: List[Dict[str, str]], idea_struct: Dict[str, Any]) -> str:
+def _summarize_content(scraped_data: List[Dict[str, str]], idea_struct: Dict[str, Any],
+                       on_delta: Optional[Callable[[str], None]] = None,
+                       on_reset: Optional[Callable[[], None]] = None) -> str:
     """Summarize scraped content using the configured LLM when available.
 
-    Falls back to a simple truncation-based summary if the external
-    model is not configured or errors.
+    Falls back to a local extractive summary if the external model is not
+    configured, errors, or the extractive mode is selected. When the LLM
+    is used, the research text is first packed into a token budget
+    (see :mod:`app.prompt_budget`) so the prompt stays small. If ``on_delta`` is given, the
+    completion is streamed and each chunk is passed to it as it arrives; if the
+    stream fails after some chunks were delivered, ``on_reset`` is called before
+    falling back, so listeners can discard the partial text.
     """
     if not scraped_data:
         return "No content available for summarization."
 
-    combined_text = " ".join([item["text"] for item in scraped_data if item.get("text")])
-    if not combined_text:
+    texts = [item["text"] for item in scraped_data if item.get("text")]
+    if not texts:
         return "No text content found."
 
-    # Keep prompt reasonably small
-    combined_text = combined_text[:1600]
+    settings = get_settings()
+    query = _build_focus_query(idea_struct)
+
+    if settings.summarizer_mode == "extractive" or not is_llm_configured():
+        summary = extractive_summary(texts, query=query, max_sentences=settings.summary_max_sentences)
+        return summary or "No text content found."
+
+    # Keep prompt small: only the most relevant, non-duplicate passages that fit the budget
+    combined_text = build_context(texts, query, settings.llm_context_tokens)
 
     industry = idea_struct.get("industry", "startup")
     audience = idea_struct.get("target_audience", "target customers")
@@ -197,12 +218,26 @@ def _summarize_content(scraped_data: List[Dict[str, str]], idea_struct: Dict[str
         f"{combined_text}"
     )
 
+    parts: List[str] = []
     try:
-        return generate_text_sync(prompt, max_tokens=600)
+        if on_delta is None:
+            return generate_text_sync(prompt, max_tokens=600)
+        for chunk in stream_text_sync(prompt, max_tokens=600):
+            parts.append(chunk)
+            on_delta(chunk)
+        return "".join(parts)
     except Exception as exc:
-        print(f"LLM summarization error, falling back to raw text: {exc}")
-        # Fallback: return first 200 characters
-        return combined_text[:200] + "..."
+        print(f"LLM summarization error, falling back to extractive summary: {exc}")
+        if parts and on_reset is not None:
+            on_reset()
+        return extractive_summary(texts, query=query, max_sentences=settings.summary_max_sentences)
+
+
+def _build_focus_query(idea_struct: Dict[str, Any]) -> str:
+    """Build a short text describing the idea, used to rank research sentences."""
+    parts = [idea_struct.get("industry", ""), idea_struct.get("target_audience", "")]
+    parts.extend(idea_struct.get("features", []))
+    return " ".join(part for part in parts if part)
 
 
 def _extract_competitors(scraped_data: List[Dict[str, str]]) -> List[Dict[str, str]]:
@@ -0,0 +1,428 @@
+"""Process-wide local text generation model.
+
+The GPT-2 pipeline used by the generator is loaded lazily, once per
+process, on the first generation or by :func:`warm_up`. Importing this
+module (or ``generator_agent``) no longer pulls in torch, so the API
+process and worker processes that only parse ideas stay small and start
+quickly. :func:`model_status` reports readiness and memory use for
+health checks.
+
+``GENERATOR_BACKEND`` selects how the model runs on CPU: ``torch``
+(fp32), ``torch-int8`` (PyTorch dynamic int8 quantization of the linear
+layers) or ``onnx`` (ONNX Runtime via optimum, exported once into
+``MODEL_CACHE_DIR``). ``tools/check_generator_parity.py`` compares a
+backend's output quality and latency against fp32.
+
+Concurrent :func:`generate` calls with the same generation settings
+(in practice, the same section for different jobs) are gathered by a
+:class:`MicroBatcher` for a few milliseconds and run as one left-padded
+batch, which keeps the CPU busy with far fewer, larger forward passes
+than batch-size-1 generation.
+"""
+import functools
+import json
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from . import thread_budget
+from .config import get_settings
+
+# Model state: not_loaded -> loading -> ready | unavailable, or disabled
+_generator = None
+_state = "not_loaded"
+_error: Optional[str] = None
+_load_seconds: Optional[float] = None
+_backend: Optional[str] = None
+_lock = threading.Lock()
+_batcher: Optional["MicroBatcher"] = None
+_batcher_lock = threading.Lock()
+
+
+def get_generator():
+    """Return the text-generation pipeline, loading it on first use.
+
+    Returns None if local models are disabled or transformers/torch are
+    not available, in which case callers use their template fallbacks.
+    Concurrent callers wait for a single load.
+    """
+    global _generator, _state, _error, _load_seconds, _backend
+    if _state in ("ready", "unavailable", "disabled"):
+        return _generator
+
+    with _lock:
+        if _state in ("ready", "unavailable", "disabled"):
+            return _generator
+
+        settings = get_settings()
+        if not settings.use_local_models:
+            _state = "disabled"
+            return None
+
+        _state = "loading"
+        started = time.monotonic()
+        try:
+            _generator, _backend = load_pipeline(settings.generator_model, settings.generator_backend)
+            _load_seconds = round(time.monotonic() - started, 2)
+            _state = "ready"
+            print(f"✓ Text generator loaded ({settings.generator_model}, {_backend}, {_load_seconds}s)")
+        except Exception as e:
+            print(f"Text generator not available: {e}")
+            _generator = None
+            _error = str(e)
+            _state = "unavailable"
+
+    return _generator
+
+
+def _quantize_int8(model):
+    """Dynamically quantize a causal LM's linear layers to int8.
+
+    GPT-2 implements its projections as ``Conv1D`` (a transposed linear
+    layer) which ``quantize_dynamic`` skips, so they are swapped for
+    equivalent ``nn.Linear`` modules first.
+    """
+    import torch
+    from transformers.pytorch_utils import Conv1D
+
+    for parent in list(model.modules()):
+        for name, child in list(parent.named_children()):
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(parent, name, linear)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _load_onnx_model(model_name: str):
+    """Load an ONNX Runtime causal LM, exporting it on first use."""
+    from optimum.onnxruntime import ORTModelForCausalLM
+
+    export_dir = os.path.join(get_settings().model_cache_dir, "onnx", model_name.replace("/", "--"))
+    if os.path.isdir(export_dir):
+        return ORTModelForCausalLM.from_pretrained(export_dir)
+    model = ORTModelForCausalLM.from_pretrained(model_name, export=True)
+    model.save_pretrained(export_dir)
+    return model
+
+
+def load_pipeline(model_name: str, backend: str = "torch"):
+    """Build a text-generation pipeline for ``model_name`` on ``backend``.
+
+    Args:
+        model_name: Hugging Face model id
+        backend: "torch", "torch-int8" or "onnx"; "onnx" falls back to
+            "torch" when optimum/onnxruntime are not installed
+
+    Returns:
+        (pipeline, backend actually used)
+    """
+    from transformers import AutoModelForCausalLM, AutoTokenizer, pipeline
+
+    thread_budget.apply_torch()
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = None
+    if backend == "onnx":
+        try:
+            model = _load_onnx_model(model_name)
+        except ImportError as e:
+            print(f"⚠ ONNX Runtime backend not available ({e}), using torch")
+            backend = "torch"
+    if model is None:
+        model = AutoModelForCausalLM.from_pretrained(model_name)
+        model.eval()
+        if backend == "torch-int8":
+            model = _quantize_int8(model)
+        elif backend != "torch":
+            print(f"⚠ Unknown generator backend {backend!r}, using torch")
+            backend = "torch"
+
+    # GPT-2 has no pad token; batched prompts are padded on the left so
+    # every row's continuation starts right after its own prompt
+    if tokenizer.pad_token is None:
+        tokenizer.pad_token = tokenizer.eos_token
+        model.config.pad_token_id = tokenizer.eos_token_id
+    tokenizer.padding_side = "left"
+    return pipeline("text-generation", model=model, tokenizer=tokenizer), backend
+
+
+def _key_part(value: Any) -> Any:
+    """JSON stand-in for a non-JSON generation argument in a batch key.
+
+    Functions are named by module and qualified name and partials by
+    their function and bound arguments, so two jobs passing equal
+    ``stop_when`` callables (including freshly built partials) group
+    together regardless of object identity.
+    """
+    if isinstance(value, functools.partial):
+        return [_key_part(value.func), list(value.args), value.keywords]
+    qualname = getattr(value, "__qualname__", None)
+    if qualname is not None:
+        return f"{getattr(value, '__module__', '')}.{qualname}"
+    return repr(value)
+
+
+class _Request:
+    __slots__ = ("prompt", "kwargs", "key", "done", "result", "error")
+
+    def __init__(self, prompt: str, kwargs: Dict[str, Any]):
+        self.prompt = prompt
+        self.kwargs = kwargs
+        # Only requests with identical generation settings share a batch
+        self.key = json.dumps(kwargs, sort_keys=True, default=_key_part)
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class MicroBatcher:
+    """Collects concurrent generation requests and runs them in batches.
+
+    A single dispatcher thread waits for the first request, keeps
+    collecting for ``window_ms`` (or until ``max_batch_size`` requests
+    are queued), then runs each group of compatible requests as one
+    batch and hands every caller its own result.
+    """
+
+    def __init__(self, run_batch: Callable[[List[str], Dict[str, Any]], List[Any]],
+                 window_ms: float, max_batch_size: int):
+        self.run_batch = run_batch
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._largest = 0
+
+    def submit(self, prompt: str, **kwargs: Any) -> Any:
+        """Queue a request and block until its batch has run."""
+        self._ensure_started()
+        request = _Request(prompt, kwargs)
+        self._queue.put(request)
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="generation-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self) -> List[_Request]:
+        pending = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(pending) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                pending.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return pending
+
+    def _loop(self) -> None:
+        while True:
+            groups: Dict[str, List[_Request]] = {}
+            for request in self._collect():
+                groups.setdefault(request.key, []).append(request)
+            for group in groups.values():
+                self._run(group)
+
+    def _run(self, group: List[_Request]) -> None:
+        try:
+            results = self.run_batch([r.prompt for r in group], group[0].kwargs)
+            for request, result in zip(group, results):
+                request.result = result
+        except BaseException as e:
+            for request in group:
+                request.error = e
+        finally:
+            with self._stats_lock:
+                self._batches += 1
+                self._requests += len(group)
+                self._largest = max(self._largest, len(group))
+            for request in group:
+                request.done.set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "window_ms": self.window * 1000.0,
+                "max_batch_size": self.max_batch_size,
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": round(self._requests / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest,
+            }
+
+
+def _stopping_criteria(tokenizer, stop_when: Callable[[str], bool]):
+    """Stop decoding once ``stop_when`` holds for every row's generated text.
+
+    Rows that already emitted the end-of-text token count as finished.
+    The criterion is checked after each decode step; the first call
+    tells it where the prompt (including any left padding) ends.
+    """
+    from transformers import StoppingCriteria, StoppingCriteriaList
+
+    class _StopWhen(StoppingCriteria):
+        def __init__(self):
+            self.start: Optional[int] = None
+
+        def __call__(self, input_ids, scores, **kwargs) -> bool:
+            if self.start is None:
+                self.start = input_ids.shape[1] - 1
+            for row in input_ids[:, self.start:].tolist():
+                if tokenizer.eos_token_id in row:
+                    continue
+                if not stop_when(tokenizer.decode(row, skip_special_tokens=True)):
+                    return False
+            return True
+
+    return StoppingCriteriaList([_StopWhen()])
+
+
+def _call_pipeline(generator, prompts, kwargs: Dict[str, Any], **extra: Any):
+    kwargs = dict(kwargs, **extra)
+    stop_when = kwargs.pop("stop_when", None)
+    if stop_when is not None:
+        kwargs["stopping_criteria"] = _stopping_criteria(generator.tokenizer, stop_when)
+    return generator(prompts, **kwargs)
+
+
+def _run_batch(prompts: List[str], kwargs: Dict[str, Any]) -> List[List[Dict[str, Any]]]:
+    """Run one padded batch through the pipeline; one result list per prompt."""
+    generator = get_generator()
+    if len(prompts) == 1:
+        return [_call_pipeline(generator, prompts[0], kwargs)]
+    return _call_pipeline(generator, prompts, kwargs, batch_size=len(prompts))
+
+
+def _get_batcher() -> Optional[MicroBatcher]:
+    global _batcher
+    settings = get_settings()
+    if settings.gen_batch_window_ms <= 0 or settings.gen_max_batch_size <= 1:
+        return None
+    if _batcher is None:
+        with _batcher_lock:
+            if _batcher is None:
+                _batcher = MicroBatcher(_run_batch, settings.gen_batch_window_ms, settings.gen_max_batch_size)
+    return _batcher
+
+
+def generate(prompt: str, **kwargs: Any) -> Optional[List[Dict[str, Any]]]:
+    """Run the text-generation pipeline on ``prompt``.
+
+    Concurrent calls are batched together unless batching is disabled
+    (``GEN_BATCH_WINDOW_MS=0``).
+
+    Args:
+        prompt: Prompt text
+        **kwargs: Pipeline generation arguments, plus optional ``stop_when``:
+            a function of a sequence's generated text that returns True once
+            it has produced enough, ending decoding early. Pass a module-level
+            function or ``functools.partial`` so identical calls can share a batch.
+
+    Returns:
+        The pipeline's list of ``{"generated_text": ...}`` results, or
+        None if no local model is available
+    """
+    generator = get_generator()
+    if generator is None:
+        return None
+    batcher = _get_batcher()
+    if batcher is None:
+        return _call_pipeline(generator, prompt, kwargs)
+    return batcher.submit(prompt, **kwargs)
+
+
+def model_tag() -> Optional[str]:
+    """Identity of the configured model for cache keys, without loading it.
+
+    Returns:
+        "<model>/<backend>", or None when local generation is disabled or
+        the model already failed to load (sections then come from templates)
+    """
+    settings = get_settings()
+    if not settings.use_local_models or _state in ("unavailable", "disabled"):
+        return None
+    return f"{settings.generator_model}/{_backend or settings.generator_backend}"
+
+
+def warm_up(background: bool = True) -> Optional[threading.Thread]:
+    """Load the model ahead of the first generation.
+
+    Args:
+        background: Load in a daemon thread and return it instead of blocking
+    """
+    if not background:
+        get_generator()
+        return None
+    thread = threading.Thread(target=get_generator, name="generator-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _rss_bytes() -> Optional[int]:
+    """Resident memory of this process."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # Peak rather than current RSS; kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if os.uname().sysname == "Darwin" else peak * 1024
+    except Exception:
+        return None
+
+
+def _tensor_bytes(value: Any) -> int:
+    if hasattr(value, "element_size"):
+        return value.numel() * value.element_size()
+    # Quantized linear layers store their packed weight and bias as a tuple
+    if isinstance(value, (tuple, list)):
+        return sum(_tensor_bytes(item) for item in value)
+    return 0
+
+
+def _param_bytes() -> Optional[int]:
+    """Weight memory of the loaded torch model (None for ONNX Runtime)."""
+    if _generator is None:
+        return None
+    try:
+        return sum(_tensor_bytes(value) for value in _generator.model.state_dict().values())
+    except Exception:
+        return None
+
+
+def model_status() -> Dict[str, Any]:
+    """Readiness and memory use of the local text model, for health checks."""
+    return {
+        "model": get_settings().generator_model,
+        "backend": _backend,
+        "state": _state,
+        # Generation never blocks once loading has finished, even without a model
+        "ready": _state in ("ready", "unavailable", "disabled"),
+        "error": _error,
+        "load_seconds": _load_seconds,
+        "batching": _batcher.snapshot() if _batcher is not None else None,
+        "memory": {
+            "rss_bytes": _rss_bytes(),
+            "param_bytes": _param_bytes(),
+        },
+    }
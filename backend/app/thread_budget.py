@@ -0,0 +1,133 @@
+"""CPU thread budgets for torch, BLAS and spaCy.
+
+torch and the BLAS libraries behind numpy/spaCy each default to one
+thread per core. With several worker processes doing that at once the
+machine is heavily oversubscribed and throughput drops below running
+jobs one at a time. Each process instead gets a share of the cores:
+``cores // workers`` threads unless ``CPU_THREADS_PER_WORKER`` is set,
+optionally pinned to its own cores with ``CPU_AFFINITY``.
+
+BLAS thread counts are read from the environment when the libraries
+load, so :func:`apply` must run before numpy, spaCy or torch are
+imported; torch's own thread pools are configured through its API as
+soon as it is imported (see :func:`apply_torch`).
+"""
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+from .config import get_settings
+
+
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+)
+
+# Budget applied in this process (None until apply() runs)
+_budget: Optional[Dict[str, Any]] = None
+_torch_applied = False
+
+
+def available_cores() -> List[int]:
+    """CPU ids this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def compute_budget(workers: int, cores: Optional[int] = None,
+                   threads_per_worker: int = 0, interop_threads: int = 1) -> Dict[str, int]:
+    """Split ``cores`` between ``workers`` processes.
+
+    Args:
+        workers: Processes sharing the machine (at least 1)
+        cores: Cores available (defaults to this process's CPU set)
+        threads_per_worker: Fixed intra-op thread count (0 = cores // workers)
+        interop_threads: torch inter-op threads
+
+    Returns:
+        intra_op_threads, interop_threads and blas_threads per process
+    """
+    workers = max(1, workers)
+    cores = cores or len(available_cores())
+    threads = threads_per_worker if threads_per_worker > 0 else max(1, cores // workers)
+    return {
+        "intra_op_threads": threads,
+        "interop_threads": max(1, interop_threads),
+        "blas_threads": threads,
+    }
+
+
+def apply(workers: int, worker_index: Optional[int] = None) -> Dict[str, Any]:
+    """Apply this process's share of the CPU budget.
+
+    Args:
+        workers: Processes sharing the machine
+        worker_index: This process's index among them; used to pick its
+            cores when ``CPU_AFFINITY`` is enabled
+
+    Returns:
+        The applied budget (see :func:`status`)
+    """
+    global _budget, _torch_applied
+    settings = get_settings()
+    cores = available_cores()
+    budget: Dict[str, Any] = compute_budget(
+        workers, len(cores), settings.cpu_threads_per_worker, settings.cpu_interop_threads
+    )
+
+    for variable in BLAS_THREAD_VARIABLES:
+        os.environ[variable] = str(budget["blas_threads"])
+
+    budget["affinity"] = None
+    if settings.cpu_affinity and worker_index is not None and hasattr(os, "sched_setaffinity"):
+        threads = budget["intra_op_threads"]
+        start = (worker_index * threads) % len(cores)
+        pinned = [cores[(start + i) % len(cores)] for i in range(min(threads, len(cores)))]
+        try:
+            os.sched_setaffinity(0, pinned)
+            budget["affinity"] = pinned
+        except OSError as e:
+            print(f"⚠ Could not pin worker {worker_index} to CPUs {pinned}: {e}")
+
+    budget["workers"] = max(1, workers)
+    budget["worker_index"] = worker_index
+    _budget = budget
+    _torch_applied = False
+    # torch reads nothing from the environment once loaded; configure it directly
+    if "torch" in sys.modules:
+        apply_torch()
+    return status()
+
+
+def apply_torch() -> None:
+    """Set torch's intra-op and inter-op pools to the process budget.
+
+    Safe to call repeatedly; inter-op threads can only be set before
+    torch runs any parallel work, so later attempts are skipped.
+    """
+    global _torch_applied
+    if _budget is None or _torch_applied:
+        return
+    try:
+        import torch
+    except ImportError:
+        return
+    torch.set_num_threads(_budget["intra_op_threads"])
+    try:
+        torch.set_num_interop_threads(_budget["interop_threads"])
+    except RuntimeError:
+        # Already started; the intra-op setting above still applies
+        pass
+    _torch_applied = True
+
+
+def status() -> Dict[str, Any]:
+    """The budget applied in this process, for stats."""
+    if _budget is None:
+        return {"applied": False, "cores": len(available_cores())}
+    return {"applied": True, "cores": len(available_cores()), "torch_configured": _torch_applied, **_budget}
@@ -0,0 +1,259 @@
+"""Process pool for CPU-bound NLP parsing and content generation.
+
+spaCy parsing and local GPT-2 generation hold the GIL, so running them
+in the API process stalls request handling and every other job. With
+``CPU_POOL_SIZE`` > 0 they run in worker processes instead, each of
+which loads the models once when it starts (the text model only with
+``GENERATOR_PRELOAD``, otherwise on its first generation). Submissions are bounded by
+``CPU_POOL_MAX_PENDING`` and every call has a timeout; with
+``CPU_POOL_SIZE=0`` the functions run inline in the calling thread.
+
+LLM API calls are never made from the workers: the rate limiter and
+circuit breaker are per process, so consolidated generation fetches its
+LLM document here and only hands the fallbacks to the pool.
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import thread_budget
+from .config import get_settings
+
+
+class WorkerPoolBusyError(Exception):
+    """Raised when the pool's queue stays full for the whole timeout."""
+
+
+class WorkerPoolStoppedError(RuntimeError):
+    """Raised when the pool is shut down while a call is being submitted."""
+
+
+class WorkerTimeoutError(TimeoutError):
+    """Raised when a submitted call does not finish within its timeout."""
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+_pending: Optional[threading.BoundedSemaphore] = None
+_warm_futures: List[Future] = []
+_worker_counter = None
+_stats_lock = threading.Lock()
+_stats = {"submitted": 0, "completed": 0, "failed": 0, "timeouts": 0, "rejected": 0, "restarts": 0}
+_in_flight = 0
+
+
+def _init_worker(counter, workers: int) -> None:
+    """Apply the worker's CPU thread budget, then preload its models."""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    # Before any model import, so BLAS libraries pick up the thread limits
+    thread_budget.apply(workers, index % workers)
+
+    from . import nlp_parser, text_model
+
+    nlp_parser.warm_up(background=False)
+    if get_settings().generator_preload:
+        text_model.warm_up(background=False)
+
+
+def _ping() -> bool:
+    return True
+
+
+def _count(stat: str) -> None:
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def _finished(_: Future) -> None:
+    global _in_flight
+    with _stats_lock:
+        _in_flight -= 1
+    _pending.release()
+
+
+def is_enabled() -> bool:
+    return get_settings().cpu_pool_size > 0
+
+
+def start() -> None:
+    """Start the pool and have every worker load its models.
+
+    Workers are spawned rather than forked so they do not inherit the
+    API process's threads or a half-initialized model.
+    """
+    global _pool, _pending, _warm_futures, _worker_counter
+    settings = get_settings()
+    if settings.cpu_pool_size <= 0:
+        return
+    with _pool_lock:
+        if _pool is not None:
+            return
+        context = multiprocessing.get_context("spawn")
+        if _worker_counter is None:
+            _worker_counter = context.Value("i", 0)
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.cpu_pool_size,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(_worker_counter, settings.cpu_pool_size),
+        )
+        if _pending is None:
+            _pending = threading.BoundedSemaphore(max(1, settings.cpu_pool_max_pending))
+        # Submitting a no-op per worker starts the processes (and their
+        # initializers) now instead of on the first real request
+        _warm_futures = [_pool.submit(_ping) for _ in range(settings.cpu_pool_size)]
+    print(f"✓ CPU worker pool started ({settings.cpu_pool_size} processes)")
+
+
+def shutdown() -> None:
+    """Stop the pool, cancelling calls that have not started yet."""
+    global _pool, _warm_futures
+    with _pool_lock:
+        pool, _pool = _pool, None
+        _warm_futures = []
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _restart(broken: ProcessPoolExecutor) -> None:
+    """Replace a pool whose worker died so later calls get fresh processes."""
+    global _pool
+    with _pool_lock:
+        if _pool is not broken:
+            return
+        _pool = None
+    broken.shutdown(wait=False, cancel_futures=True)
+    _count("restarts")
+    start()
+
+
+def submit(fn: Callable[..., Any], *args: Any, timeout: float, **kwargs: Any) -> Any:
+    """Run ``fn(*args, **kwargs)`` in the pool and wait for its result.
+
+    Runs inline when the pool is disabled. ``timeout`` covers both waiting
+    for a free queue slot and the call itself; the slot is only released
+    once the worker actually finishes, so a stuck call keeps counting
+    against ``CPU_POOL_MAX_PENDING``.
+
+    Raises:
+        WorkerPoolBusyError: No queue slot freed up within ``timeout``
+        WorkerPoolStoppedError: The pool was shut down (e.g. the application
+            is stopping) before the call could be submitted
+        WorkerTimeoutError: The call did not finish within ``timeout``
+    """
+    global _in_flight
+    if not is_enabled():
+        return fn(*args, **kwargs)
+    start()
+
+    deadline = time.monotonic() + timeout
+    if not _pending.acquire(timeout=timeout):
+        _count("rejected")
+        raise WorkerPoolBusyError(f"CPU worker pool is full ({get_settings().cpu_pool_max_pending} pending calls)")
+
+    with _pool_lock:
+        pool = _pool
+    if pool is None:
+        _pending.release()
+        raise WorkerPoolStoppedError("CPU worker pool stopped")
+    try:
+        future = pool.submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        _pending.release()
+        raise
+    except RuntimeError as e:
+        # shutdown() ran between taking the reference and submitting
+        _pending.release()
+        raise WorkerPoolStoppedError(f"CPU worker pool stopped: {e}") from e
+    except Exception:
+        _pending.release()
+        raise
+    with _stats_lock:
+        _stats["submitted"] += 1
+        _in_flight += 1
+    future.add_done_callback(_finished)
+
+    try:
+        result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+    except TimeoutError:
+        future.cancel()
+        _count("timeouts")
+        raise WorkerTimeoutError(f"{fn.__name__} did not finish within {timeout:g}s")
+    except BrokenProcessPool:
+        _count("failed")
+        _restart(pool)
+        raise
+    except Exception:
+        _count("failed")
+        raise
+    _count("completed")
+    return result
+
+
+def run_parse_idea(idea_text: str) -> Dict[str, Any]:
+    from .nlp_parser import parse_idea
+
+    return submit(parse_idea, idea_text, timeout=get_settings().cpu_pool_parse_timeout_seconds)
+
+
+def run_parse_ideas(texts: List[str]) -> List[Dict[str, Any]]:
+    from .nlp_parser import parse_ideas
+
+    timeout = get_settings().cpu_pool_parse_timeout_seconds * max(1, len(texts) // 64 + 1)
+    return submit(parse_ideas, texts, timeout=timeout)
+
+
+def run_generate(idea_struct: dict, research_results: dict, fresh: bool = False) -> dict:
+    from .generator_agent import fetch_consolidated_document, generate_branding_and_content
+    from .llm_client import is_llm_configured
+
+    settings = get_settings()
+    consolidated = None
+    if is_enabled() and settings.generation_mode == "consolidated" and is_llm_configured():
+        # The LLM call stays in this process so every request goes through
+        # the one rate limiter and circuit breaker; workers only run fallbacks
+        consolidated = fetch_consolidated_document(idea_struct, research_results, fresh)
+    return submit(
+        generate_branding_and_content, idea_struct, research_results, fresh=fresh,
+        consolidated=consolidated, timeout=settings.cpu_pool_generate_timeout_seconds,
+    )
+
+
+def run_regenerate_section(section: str, idea_struct: dict, research_results: dict,
+                           previous: Any = None) -> Tuple[Any, str]:
+    from .generator_agent import regenerate_section
+
+    return submit(
+        regenerate_section, section, idea_struct, research_results, previous,
+        timeout=get_settings().cpu_pool_generate_timeout_seconds,
+    )
+
+
+def pool_status() -> Dict[str, Any]:
+    """Pool size, readiness and call counters, for health checks and stats."""
+    settings = get_settings()
+    with _pool_lock:
+        running = _pool is not None
+        warm = list(_warm_futures)
+    with _stats_lock:
+        counters = dict(_stats)
+        in_flight = _in_flight
+    return {
+        "enabled": settings.cpu_pool_size > 0,
+        "size": settings.cpu_pool_size,
+        "running": running,
+        # Ready once at least one worker has loaded its models
+        "ready": any(f.done() and not f.cancelled() and f.exception() is None for f in warm) if warm else not running,
+        "max_pending": settings.cpu_pool_max_pending,
+        "thread_budget": thread_budget.compute_budget(
+            settings.cpu_pool_size, threads_per_worker=settings.cpu_threads_per_worker,
+            interop_threads=settings.cpu_interop_threads,
+        ) if settings.cpu_pool_size > 0 else None,
+        "in_flight": in_flight,
+        **counters,
+    }
@@ -0,0 +1,126 @@
+"""Benchmark the rule-based idea parser against the spaCy parser.
+
+Builds a corpus of synthetic startup ideas, parses it with both paths
+(bypassing the parse memo) and reports throughput plus per-field
+agreement: exact match for industry and audience, Jaccard similarity
+for features. Run it from the backend directory::
+
+    python tools/bench_parser.py --ideas 2000 --repeat 3
+
+If spaCy or its model is not installed only the rule parser is timed.
+"""
+import argparse
+import itertools
+import os
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import nlp_parser  # noqa: E402
+
+
+TEMPLATES = (
+    "{adj} {industry} app for {audience} with {features}",
+    "A {industry} platform for {audience} including {features}.",
+    "{Adj} {industry} service helping {audience}, featuring {features}",
+    "An AI-powered {industry} tool for {audience} that offers {features}",
+    "Marketplace for {audience} in {industry} with {features}; launching in Kenya",
+)
+ADJECTIVES = ("smart", "affordable", "on-demand", "community", "mobile-first", "sustainable")
+INDUSTRIES = ("grocery", "fitness", "education", "healthcare", "fintech", "travel",
+              "agriculture", "real estate", "logistics", "fashion")
+AUDIENCES = ("rural areas", "college students", "elderly people", "small businesses",
+             "busy parents", "remote teams", "farmers", "freelancers")
+FEATURES = ("delivery", "digital payments", "progress tracking", "video lessons",
+            "ai recommendations", "offline mode", "group chat", "subscription plans",
+            "voice search", "loyalty rewards")
+
+
+def build_corpus(size: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    combos = list(itertools.product(TEMPLATES, INDUSTRIES, AUDIENCES))
+    rng.shuffle(combos)
+    ideas = []
+    for template, industry, audience in itertools.islice(itertools.cycle(combos), size):
+        picked = rng.sample(FEATURES, rng.randint(1, 3))
+        features = picked[0] if len(picked) == 1 else ", ".join(picked[:-1]) + " and " + picked[-1]
+        adjective = rng.choice(ADJECTIVES)
+        ideas.append(template.format(
+            adj=adjective, Adj=adjective.capitalize(), industry=industry,
+            audience=audience, features=features,
+        ))
+    return ideas
+
+
+def _time(parse: Callable[[List[str]], List[Dict[str, Any]]], ideas: List[str], repeat: int):
+    best = float("inf")
+    results: List[Dict[str, Any]] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        results = parse(ideas)
+        best = min(best, time.perf_counter() - started)
+    return best, results
+
+
+def _jaccard(a: List[str], b: List[str]) -> float:
+    a, b = set(a), set(b)
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def agreement(left: List[Dict[str, Any]], right: List[Dict[str, Any]]) -> Dict[str, float]:
+    n = len(left) or 1
+    return {
+        "industry": sum(l["industry"] == r["industry"] for l, r in zip(left, right)) / n,
+        "target_audience": sum(l["target_audience"] == r["target_audience"] for l, r in zip(left, right)) / n,
+        "features_jaccard": sum(_jaccard(l["features"], r["features"]) for l, r in zip(left, right)) / n,
+    }
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--ideas", type=int, default=1000, help="Corpus size")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per parser (best is reported)")
+    parser.add_argument("--batch-size", type=int, default=64, help="nlp.pipe batch size")
+    parser.add_argument("--show", type=int, default=5, help="Print this many disagreeing ideas")
+    args = parser.parse_args(argv)
+
+    ideas = build_corpus(args.ideas)
+    print(f"Corpus: {len(ideas)} ideas")
+
+    rules_seconds, rules_results = _time(
+        lambda texts: [nlp_parser._parse_with_rules(text) for text in texts], ideas, args.repeat
+    )
+    print(f"rules : {rules_seconds:.3f}s  ({len(ideas) / rules_seconds:,.0f} ideas/s)")
+
+    nlp = nlp_parser.get_nlp()
+    if nlp is None:
+        print("spacy : unavailable, skipping comparison")
+        return
+
+    spacy_seconds, spacy_results = _time(
+        lambda texts: [nlp_parser._parse_doc(doc) for doc in nlp.pipe(texts, batch_size=args.batch_size)],
+        ideas, args.repeat,
+    )
+    print(f"spacy : {spacy_seconds:.3f}s  ({len(ideas) / spacy_seconds:,.0f} ideas/s)")
+    print(f"speedup: {spacy_seconds / rules_seconds:.1f}x")
+
+    for field, score in agreement(rules_results, spacy_results).items():
+        print(f"agreement {field}: {score:.1%}")
+
+    shown = 0
+    for idea, rules, spacy_result in zip(ideas, rules_results, spacy_results):
+        if shown >= args.show:
+            break
+        if (rules["industry"], rules["target_audience"]) != (spacy_result["industry"], spacy_result["target_audience"]):
+            print(f"\n{idea}\n  rules: {rules['industry']!r} / {rules['target_audience']!r} / {rules['features']}"
+                  f"\n  spacy: {spacy_result['industry']!r} / {spacy_result['target_audience']!r} / {spacy_result['features']}")
+            shown += 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Find the best worker count / threads-per-worker split for this machine.
+
+Runs the same CPU-bound workload through process pools of different
+sizes, with each worker's torch/BLAS threads set by ``app.thread_budget``,
+and reports throughput and latency for every configuration. Run it from
+the backend directory::
+
+    python tools/bench_threads.py --workload generate --tasks 48
+    python tools/bench_threads.py --workload parse --affinity
+
+Workloads: ``generate`` (short GPT-2 generations, needs transformers),
+``parse`` (spaCy ``parse_idea``) and ``matmul`` (numpy BLAS, a proxy
+when neither model is installed). Copy the winning numbers into
+``CPU_POOL_SIZE`` and ``CPU_THREADS_PER_WORKER``.
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app import thread_budget  # noqa: E402
+
+
+IDEA = "Smart grocery delivery app for rural areas with digital payments and offline mode"
+PROMPT = "Generate creative brand names for a grocery business targeting rural areas.\nBrand names:\n1."
+
+
+def _init(counter, workers: int, workload: str) -> None:
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    thread_budget.apply(workers, index % workers)
+    if workload == "generate":
+        from app import text_model
+        text_model.warm_up(background=False)
+    elif workload == "parse":
+        from app import nlp_parser
+        nlp_parser.warm_up(background=False)
+
+
+def _task(workload: str, index: int) -> float:
+    started = time.perf_counter()
+    if workload == "generate":
+        from app import text_model
+        text_model.get_generator()(PROMPT, max_new_tokens=32, do_sample=False)
+    elif workload == "parse":
+        from app import nlp_parser
+        # Distinct text per task so the parse memo never short-circuits
+        nlp_parser.parse_idea(f"{IDEA} {index}")
+    else:
+        import numpy as np
+        a = np.random.default_rng(index).random((600, 600))
+        for _ in range(5):
+            a = a @ a
+            a /= np.abs(a).max()
+    return time.perf_counter() - started
+
+
+def run_config(workload: str, workers: int, threads: int, tasks: int, affinity: bool) -> Dict[str, float]:
+    # Spawned workers read their settings from the environment
+    os.environ["CPU_THREADS_PER_WORKER"] = str(threads)
+    os.environ["CPU_AFFINITY"] = "true" if affinity else "false"
+    os.environ["CPU_INTEROP_THREADS"] = "1"
+    os.environ["GEN_BATCH_WINDOW_MS"] = "0"
+    os.environ["PARSE_MEMO_PERSIST"] = "false"
+
+    context = multiprocessing.get_context("spawn")
+    counter = context.Value("i", 0)
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init,
+                             initargs=(counter, workers, workload)) as pool:
+        # Warm every worker (and its initializer) before timing
+        list(pool.map(_task, [workload] * workers, range(workers)))
+        started = time.perf_counter()
+        latencies = list(pool.map(_task, [workload] * tasks, range(tasks)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "throughput": tasks / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000,
+    }
+
+
+def candidate_configs(cores: int, max_workers: int) -> List[Tuple[int, int]]:
+    configs = []
+    workers = 1
+    while workers <= min(cores, max_workers):
+        fair = max(1, cores // workers)
+        for threads in sorted({1, fair, fair * 2}):
+            configs.append((workers, threads))
+        workers *= 2
+    return configs
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--workload", choices=["auto", "generate", "parse", "matmul"], default="auto")
+    parser.add_argument("--tasks", type=int, default=32, help="Timed tasks per configuration")
+    parser.add_argument("--max-workers", type=int, default=8)
+    parser.add_argument("--affinity", action="store_true", help="Pin workers to cores")
+    args = parser.parse_args(argv)
+
+    workload = args.workload
+    if workload == "auto":
+        try:
+            import transformers  # noqa: F401
+            workload = "generate"
+        except ImportError:
+            workload = "matmul"
+
+    cores = len(thread_budget.available_cores())
+    print(f"Workload: {workload}, cores: {cores}, tasks per config: {args.tasks}")
+    print(f"{'workers':>7} {'threads':>7} {'tasks/s':>9} {'p50 ms':>9} {'p95 ms':>9}")
+
+    results = []
+    for workers, threads in candidate_configs(cores, args.max_workers):
+        report = run_config(workload, workers, threads, args.tasks, args.affinity)
+        results.append((workers, threads, report))
+        print(f"{workers:>7} {threads:>7} {report['throughput']:>9.2f} "
+              f"{report['p50_ms']:>9.1f} {report['p95_ms']:>9.1f}")
+
+    workers, threads, report = max(results, key=lambda item: item[2]["throughput"])
+    print(f"\nBest: CPU_POOL_SIZE={workers} CPU_THREADS_PER_WORKER={threads} "
+          f"({report['throughput']:.2f} tasks/s)")
+
+
+if __name__ == "__main__":
+    main()
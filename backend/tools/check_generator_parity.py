@@ -0,0 +1,130 @@
+"""Compare a quantized or ONNX generator backend against fp32 PyTorch.
+
+Generates brand names for a set of ideas with both backends, using the
+same prompts, sampling settings and seeds as ``generator_agent``, and
+reports output quality (``_score_name`` heuristics behind
+``_filter_and_score_names``), per-token latency and weight memory. Run
+it from the backend directory::
+
+    python tools/check_generator_parity.py --backend torch-int8
+    python tools/check_generator_parity.py --backend onnx --samples 20
+
+Exits with status 1 when the candidate's mean top-10 score drops more
+than ``--tolerance`` below fp32.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from functools import partial
+from typing import Any, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import text_model  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.generator_agent import (  # noqa: E402
+    BRAND_NAME_PROMPT, _extract_list_items, _has_list_items, _items_per_sequence, _score_name,
+)
+
+
+IDEAS: List[Tuple[str, str]] = [
+    ("grocery", "rural areas"),
+    ("fitness", "elderly people"),
+    ("education", "college students"),
+    ("healthcare", "busy parents"),
+    ("fintech", "small businesses"),
+    ("travel", "remote teams"),
+    ("agriculture", "farmers"),
+    ("fashion", "young professionals"),
+    ("logistics", "online sellers"),
+    ("music", "independent artists"),
+]
+
+# Same settings _generate_brand_names uses
+GENERATION_KWARGS = {
+    "max_new_tokens": 80, "num_return_sequences": 3, "temperature": 0.9, "do_sample": True,
+    "stop_when": partial(_has_list_items, min_items=_items_per_sequence(10, 3)),
+}
+
+
+def evaluate(generator, samples: int, seed: int) -> Dict[str, Any]:
+    from transformers import set_seed
+
+    top_scores: List[float] = []
+    valid_counts: List[int] = []
+    per_token_ms: List[float] = []
+    for index in range(samples):
+        industry, audience = IDEAS[index % len(IDEAS)]
+        prompt = BRAND_NAME_PROMPT.format(industry=industry, audience=audience)
+        prompt_tokens = len(generator.tokenizer.encode(prompt))
+
+        set_seed(seed + index)
+        started = time.perf_counter()
+        results = text_model._call_pipeline(generator, prompt, GENERATION_KWARGS)
+        elapsed = time.perf_counter() - started
+
+        names: List[str] = []
+        new_tokens = 0
+        for result in results:
+            text = result["generated_text"]
+            new_tokens += max(1, len(generator.tokenizer.encode(text)) - prompt_tokens)
+            names.extend(_extract_list_items(text.replace(prompt, "").strip()))
+
+        scores = sorted((_score_name(name, industry) for name in set(names)), reverse=True)[:10]
+        top_scores.append(statistics.mean(scores) if scores else 0.0)
+        valid_counts.append(len(set(names)))
+        per_token_ms.append(elapsed * 1000 / new_tokens)
+
+    return {
+        "mean_top10_score": statistics.mean(top_scores),
+        "mean_valid_names": statistics.mean(valid_counts),
+        "median_ms_per_token": statistics.median(per_token_ms),
+    }
+
+
+def _weight_bytes(generator) -> int:
+    try:
+        return sum(text_model._tensor_bytes(v) for v in generator.model.state_dict().values())
+    except Exception:
+        return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default=get_settings().generator_model)
+    parser.add_argument("--backend", default="torch-int8", choices=["torch-int8", "onnx"])
+    parser.add_argument("--samples", type=int, default=10, help="Ideas to generate for")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed drop in mean top-10 name score versus fp32")
+    args = parser.parse_args(argv)
+
+    reports = {}
+    for backend in ("torch", args.backend):
+        generator, used = text_model.load_pipeline(args.model, backend)
+        # Warm-up run so one-time initialization is not timed
+        generator("Hello", max_new_tokens=4)
+        report = evaluate(generator, args.samples, args.seed)
+        report["weight_mb"] = _weight_bytes(generator) / 2 ** 20
+        reports[used] = report
+        print(f"{used:>11}: score {report['mean_top10_score']:.2f}  "
+              f"names {report['mean_valid_names']:.1f}  "
+              f"{report['median_ms_per_token']:.1f} ms/token  "
+              f"{report['weight_mb']:.0f} MB weights")
+        del generator
+
+    if len(reports) < 2:
+        print(f"{args.backend} backend unavailable; nothing to compare")
+        return 1
+
+    baseline, candidate = reports["torch"], reports[args.backend]
+    drop = baseline["mean_top10_score"] - candidate["mean_top10_score"]
+    speedup = baseline["median_ms_per_token"] / candidate["median_ms_per_token"]
+    print(f"score drop: {drop:+.2f} (tolerance {args.tolerance})  speedup: {speedup:.2f}x")
+    return 1 if drop > args.tolerance else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
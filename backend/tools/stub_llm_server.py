@@ -0,0 +1,237 @@
+"""Local OpenAI-compatible stub LLM server for load and latency testing.
+
+Implements the chat-completions endpoint used by ``app.llm_client`` with
+configurable latency, token throughput, error and 429 rates, and
+streaming, without calling a real model. Point the backend at it with::
+
+    OPENROUTER_BASE_URL=http://127.0.0.1:8001/api/v1/chat/completions
+    OPENROUTER_API_KEY=stub
+    USE_OPENAI=true
+
+Run it from the backend directory::
+
+    python tools/stub_llm_server.py --port 8001 --latency-dist lognormal \\
+        --latency-mean 0.8 --latency-stddev 0.4 --tokens-per-second 40 \\
+        --error-rate 0.02 --rate-limit-rate 0.05
+
+Every option can also be set with a ``STUB_LLM_<OPTION>`` environment
+variable (e.g. ``STUB_LLM_ERROR_RATE=0.1``). ``GET /stats`` reports
+request counts by outcome, which is handy for checking retry and
+caching behaviour; ``POST /stats/reset`` clears them.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+
+WORDS = (
+    "market growth customers platform adoption mobile rural digital payments "
+    "delivery subscription retention competitors pricing demand segment "
+    "opportunity risk regulation partnerships scale investors revenue trends"
+).split()
+
+# Canned document returned to prompts asking for the consolidated branding JSON
+CONSOLIDATED_DOCUMENT = {
+    "brand_names": ["Brightly", "Nestora", "Kindrise", "Fieldly", "Zestora",
+                    "Loomio", "Carevo", "Veranta", "Tidewell", "Sprout"],
+    "slogans": ["Built for the way you live", "Small steps, big change",
+                "Everything you need, nearby", "Simple tools for busy days",
+                "Your day, made easier"],
+    "logo_prompts": [f"Minimal flat logo, variation {i}, rounded shapes, two-color palette" for i in range(1, 6)],
+    "ad_copies": [f"Meet the app that finally gets you. Variation {i}. Try it free today!" for i in range(1, 6)],
+    "pitch_sections": {
+        key: f"Stub {key.replace('_', ' ')} text generated for load testing purposes."
+        for key in ("problem", "solution", "value_proposition", "business_model",
+                    "market_size_estimate", "go_to_market", "team_reqs")
+    },
+}
+
+
+def _env(name: str, default: Any) -> Any:
+    value = os.environ.get(f"STUB_LLM_{name.upper()}")
+    if value is None:
+        return default
+    return type(default)(value)
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=_env("host", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=_env("port", 8001))
+    parser.add_argument("--latency-dist", choices=LATENCY_DISTRIBUTIONS, default=_env("latency_dist", "lognormal"),
+                        help="Distribution of time to first token")
+    parser.add_argument("--latency-mean", type=float, default=_env("latency_mean", 0.8),
+                        help="Mean time to first token in seconds")
+    parser.add_argument("--latency-stddev", type=float, default=_env("latency_stddev", 0.4),
+                        help="Standard deviation of time to first token in seconds")
+    parser.add_argument("--tokens-per-second", type=float, default=_env("tokens_per_second", 40.0),
+                        help="Decode throughput after the first token (0 = instant)")
+    parser.add_argument("--completion-tokens", type=int, default=_env("completion_tokens", 200),
+                        help="Completion length, capped by the request's max_tokens")
+    parser.add_argument("--error-rate", type=float, default=_env("error_rate", 0.0),
+                        help="Fraction of requests answered with HTTP 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=_env("rate_limit_rate", 0.0),
+                        help="Fraction of requests answered with HTTP 429")
+    parser.add_argument("--retry-after", type=float, default=_env("retry_after", 1.0),
+                        help="Retry-After seconds sent with 429 responses")
+    parser.add_argument("--seed", type=int, default=_env("seed", 0), help="Random seed (0 = unseeded)")
+    return parser.parse_args(argv)
+
+
+class StubLLM:
+    """Simulated model: samples latency, failures and completion text."""
+
+    def __init__(self, config: argparse.Namespace):
+        self.config = config
+        self.random = random.Random(config.seed or None)
+        self._lock = threading.Lock()
+        self.stats: Counter = Counter()
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def first_token_latency(self) -> float:
+        c = self.config
+        dist, mean, stddev = c.latency_dist, c.latency_mean, c.latency_stddev
+        if dist == "fixed" or mean <= 0:
+            value = mean
+        elif dist == "uniform":
+            half_width = stddev * 3 ** 0.5
+            value = self.random.uniform(mean - half_width, mean + half_width)
+        elif dist == "normal":
+            value = self.random.gauss(mean, stddev)
+        elif dist == "exponential":
+            value = self.random.expovariate(1.0 / mean)
+        else:
+            # Parameterize the underlying normal so the lognormal has this mean and stddev
+            sigma_squared = math.log(1 + (stddev / mean) ** 2)
+            mu = math.log(mean) - sigma_squared / 2
+            value = self.random.lognormvariate(mu, math.sqrt(sigma_squared))
+        return max(0.0, value)
+
+    def outcome(self) -> str:
+        roll = self.random.random()
+        if roll < self.config.rate_limit_rate:
+            return "rate_limited"
+        if roll < self.config.rate_limit_rate + self.config.error_rate:
+            return "error"
+        return "ok"
+
+    def completion_tokens(self, prompt: str, max_tokens: int) -> List[str]:
+        if '"brand_names"' in prompt:
+            # Whole document as one token so streaming clients still get valid JSON
+            return [json.dumps(CONSOLIDATED_DOCUMENT)]
+        count = max(1, min(self.config.completion_tokens, max_tokens))
+        return [self.random.choice(WORDS) + " " for _ in range(count)]
+
+    def token_interval(self) -> float:
+        tps = self.config.tokens_per_second
+        return 1.0 / tps if tps > 0 else 0.0
+
+
+def create_app(config: argparse.Namespace) -> FastAPI:
+    stub = StubLLM(config)
+    app = FastAPI(title="Stub LLM server")
+
+    async def chat_completions(request: Request):
+        body = await request.json()
+        stub.count("requests")
+
+        outcome = stub.outcome()
+        if outcome == "rate_limited":
+            stub.count("status_429")
+            return JSONResponse(
+                {"error": {"message": "Rate limit exceeded (stub)", "code": 429}},
+                status_code=429,
+                headers={"Retry-After": f"{config.retry_after:g}"},
+            )
+        if outcome == "error":
+            stub.count("status_500")
+            return JSONResponse({"error": {"message": "Internal error (stub)", "code": 500}}, status_code=500)
+
+        messages = body.get("messages") or []
+        prompt = messages[-1].get("content", "") if messages else ""
+        tokens = stub.completion_tokens(prompt, int(body.get("max_tokens") or 800))
+        model = body.get("model", "stub-model")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+
+        await asyncio.sleep(stub.first_token_latency())
+
+        if body.get("stream"):
+            stub.count("streamed")
+
+            async def events():
+                interval = stub.token_interval()
+                for index, token in enumerate(tokens):
+                    if index and interval:
+                        await asyncio.sleep(interval)
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": created,
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+                    }
+                    yield f"data: {json.dumps(chunk)}\n\n"
+                yield "data: [DONE]\n\n"
+                stub.count("status_200")
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await asyncio.sleep(stub.token_interval() * max(0, len(tokens) - 1))
+        stub.count("status_200")
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "".join(tokens).strip()},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": len(prompt.split()),
+                "completion_tokens": len(tokens),
+                "total_tokens": len(prompt.split()) + len(tokens),
+            },
+        }
+
+    # OpenRouter-style and plain OpenAI-style paths
+    app.add_api_route("/api/v1/chat/completions", chat_completions, methods=["POST"])
+    app.add_api_route("/v1/chat/completions", chat_completions, methods=["POST"])
+
+    @app.get("/stats")
+    async def get_stats() -> Dict[str, Any]:
+        with stub._lock:
+            return {"config": vars(config), "counts": dict(stub.stats)}
+
+    @app.post("/stats/reset")
+    async def reset_stats() -> Dict[str, str]:
+        with stub._lock:
+            stub.stats.clear()
+        return {"status": "reset"}
+
+    return app
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    args = parse_args()
+    uvicorn.run(create_app(args), host=args.host, port=args.port)
@@ -61,8 +61,8 @@ const api = {
   healthCheck: () => apiClient.get('/health'),
 
   // Idea Generation Workflow
-  generateIdea: (email, idea) => 
-    apiClient.post('/api/generate', { email, idea }),
+  generateIdea: (email, idea, fresh = false) => 
+    apiClient.post('/api/generate', { email, idea, fresh }),
 
   getJobStatus: (jobId) => 
     apiClient.get(`/api/status/${jobId}`),
@@ -73,6 +73,16 @@ const api = {
   getJobResults: (jobId) => 
     apiClient.get(`/api/results/${jobId}`),
 
+  // Regenerate one branding section (brand_names, slogans, logo_prompts,
+  // ad_copies or pitch_sections) of a completed job
+  regenerateSection: (jobId, section) => 
+    apiClient.post(`/api/regenerate/${jobId}/${section}`),
+
+  // Server-sent events: status, delta, reset, section, artifacts and done
+  // (409 when the job is running but its progress is not held by this server)
+  streamJob: (jobId) => 
+    new EventSource(`${API_BASE_URL}/api/stream/${jobId}`),
+
   // Individual Module Endpoints (for future expansion)
   parseIdea: (ideaText) => 
     apiClient.post('/api/parse-idea', { idea_text: ideaText }),